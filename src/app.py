@@ -1,8 +1,10 @@
 import streamlit as st
-from translator import DocumentTranslator
-import os
+from translator import SUPPORTED_LANGUAGES
+from jobs import COMPLETED, QUEUED, RUNNING, get_job_manager
+from inline_format import strip_tags
+import hashlib
+import io
 from docx import Document
-import tempfile
 import logging
 from styles import create_mobile_friendly_layout
 
@@ -13,6 +15,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URL에 기억해 두는 최근 번역 작업 수
+MAX_REMEMBERED_JOBS = 10
+
 def extract_text_from_table(table):
     """표에서 텍스트를 추출합니다."""
     text = []
@@ -25,45 +30,47 @@ def extract_text_from_table(table):
             text.append(" | ".join(row_text))
     return "\n".join(text)
 
-def validate_docx(file_content):
-    """업로드된 파일이 유효한 Word 문서인지 확인합니다."""
+def validate_docx(doc):
+    """열린 문서가 내용이 있는 유효한 Word 문서인지 확인합니다."""
     try:
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file_path = tmp_file.name
-        
-        # 문서 열기 시도
-        doc = Document(tmp_file_path)
-        
-        # 문서 내용 상세 로깅
+        # 문서 내용 요약 로깅
         total_paragraphs = len(doc.paragraphs)
         total_tables = len(doc.tables)
         non_empty_paragraphs = len([p for p in doc.paragraphs if p.text.strip()])
         
         logger.info(f"문서 검증 - 전체 단락 수: {total_paragraphs}, 표 수: {total_tables}, 내용이 있는 단락 수: {non_empty_paragraphs}")
         
-        # 표 내용 로깅
-        for i, table in enumerate(doc.tables):
-            table_text = extract_text_from_table(table)
-            if table_text:
-                logger.info(f"표 {i+1} 내용 샘플:\n{table_text[:500]}...")
-        
-        # 각 단락 내용 로깅
-        for i, para in enumerate(doc.paragraphs):
-            if para.text.strip():
-                logger.info(f"단락 {i+1} 길이: {len(para.text)}, 내용: '{para.text[:100]}...'")
-                for j, run in enumerate(para.runs):
-                    logger.info(f"  - Run {j+1}: 텍스트: '{run.text}', 글꼴: {run.font.name}")
-        
-        # 임시 파일 삭제
-        os.unlink(tmp_file_path)
+        # 표/단락/Run 단위 상세 로깅은 큰 문서에서 매우 느리므로 DEBUG 수준에서만 수행
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, table in enumerate(doc.tables):
+                table_text = extract_text_from_table(table)
+                if table_text:
+                    logger.debug(f"표 {i+1} 내용 샘플:\n{table_text[:500]}...")
+            
+            for i, para in enumerate(doc.paragraphs):
+                if para.text.strip():
+                    logger.debug(f"단락 {i+1} 길이: {len(para.text)}, 내용: '{para.text[:100]}...'")
+                    for j, run in enumerate(para.runs):
+                        logger.debug(f"  - Run {j+1}: 텍스트: '{run.text}', 글꼴: {run.font.name}")
         
         return total_tables > 0 or total_paragraphs > 0
     except Exception as e:
         logger.error(f"문서 검증 실패: {str(e)}")
         return False
 
+def load_uploaded_document(uploaded_file):
+    """업로드된 파일을 메모리에서 한 번만 열고, 같은 파일이면 세션에 저장된 문서를 재사용합니다."""
+    file_content = uploaded_file.getvalue()
+    file_key = hashlib.sha256(file_content).hexdigest()
+    cached = st.session_state.get("uploaded_document")
+    if cached is not None and cached["key"] == file_key:
+        return cached
+    
+    doc = Document(io.BytesIO(file_content))
+    cached = {"key": file_key, "doc": doc, "valid": validate_docx(doc)}
+    st.session_state["uploaded_document"] = cached
+    return cached
+
 def main():
     # 모바일 친화적인 레이아웃 생성
     container = create_mobile_friendly_layout()
@@ -83,6 +90,7 @@ def main():
         # 파일 업로드
         uploaded_file = st.file_uploader("번역할 Word 문서를 업로드하세요", type=['docx'])
         
+        uploaded = None
         if uploaded_file is not None:
             # 파일 크기 표시
             file_size = len(uploaded_file.getvalue())
@@ -90,16 +98,9 @@ def main():
             
             # 파일 내용 미리보기
             try:
-                # 파일 포인터 초기화
-                uploaded_file.seek(0)
-                
-                # 임시 파일로 저장
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                
-                # 문서 열기
-                doc = Document(tmp_file_path)
+                # 문서 열기 (메모리에서 한 번만 파싱)
+                uploaded = load_uploaded_document(uploaded_file)
+                doc = uploaded["doc"]
                 
                 # 문서 내용 확인
                 paragraphs = []
@@ -136,66 +137,137 @@ def main():
                         structure_info.append(f"단락 {i+1}: 길이={len(para.text)}, 스타일={para.style.name}")
                     st.code("\n".join(structure_info))
                 
-                # 임시 파일 삭제
-                os.unlink(tmp_file_path)
-                
             except Exception as e:
                 logger.error(f"문서 미리보기 실패: {str(e)}")
                 st.error(f"문서 미리보기 실패: {str(e)}")
         
-        # 번역할 언어 선택
-        target_lang = st.selectbox(
+        # 번역할 언어 선택 (여러 언어를 선택하면 한 번에 번역하여 zip으로 제공)
+        target_langs = st.multiselect(
             "번역할 언어를 선택하세요",
-            ["중국어 간체", "영어", "일본어", "베트남어", "태국어", "인도네시아어"]
+            SUPPORTED_LANGUAGES,
+            default=[SUPPORTED_LANGUAGES[0]]
         )
         
-        if uploaded_file is not None and st.button("번역 시작", type="primary"):
+        if uploaded_file is not None and target_langs and st.button("번역 시작", type="primary"):
             try:
-                # 파일 검증
-                if not validate_docx(uploaded_file.getvalue()):
+                # 파일 검증 (업로드 시 수행한 결과 재사용)
+                if uploaded is None or not uploaded["valid"]:
                     st.error("유효하지 않은 Word 문서입니다. 내용이 있는 Word 문서를 업로드해주세요.")
                     return
                 
-                # 임시 파일로 업로드된 파일 저장
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                
-                # 번역기 초기화
-                translator = DocumentTranslator()
-                
-                # 진행 상태 표시
-                with st.spinner("번역 중입니다..."):
-                    # 문서 번역
-                    translated_doc = translator.translate_document(tmp_file_path, target_lang)
-                    
-                    # 번역된 문서 저장
-                    output_filename = f"translated_{uploaded_file.name}"
-                    output_path = os.path.join("data", output_filename)
-                    
-                    # data 디렉토리가 없으면 생성
-                    os.makedirs("data", exist_ok=True)
-                    
-                    # 번역된 문서 저장
-                    translated_doc.save(output_path)
-                    st.success(f"번역이 완료되었습니다. 파일이 다음 경로에 저장되었습니다: {output_path}")
-                    
-                    # 번역된 파일 다운로드 버튼
-                    with open(output_path, "rb") as file:
-                        st.download_button(
-                            label="번역된 문서 다운로드",
-                            data=file,
-                            file_name=output_filename,
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                            type="primary"
-                        )
-                    
-                    # 임시 파일 삭제
-                    os.unlink(tmp_file_path)
+                # 번역은 백그라운드 작업으로 실행 (새로고침이나 재실행에도 진행 상황 유지)
+                job_id = get_job_manager().submit(uploaded_file.name, uploaded_file.getvalue(), target_langs)
+                remember_job(job_id)
+                st.success("번역 작업이 등록되었습니다. 아래에서 진행 상황을 확인하세요.")
                     
             except Exception as e:
-                logger.error(f"번역 중 오류 발생: {str(e)}")
-                st.error(f"번역 중 오류가 발생했습니다: {str(e)}")
+                logger.error(f"번역 작업 등록 중 오류 발생: {str(e)}")
+                st.error(f"번역 작업 등록 중 오류가 발생했습니다: {str(e)}")
+        
+        # 이 브라우저에서 등록한 번역 작업의 상태
+        job_ids = remembered_jobs()
+        if job_ids:
+            render_jobs(job_ids)
+
+def remembered_jobs():
+    """URL의 쿼리 파라미터에 저장한 작업 ID 목록. 새로고침해도 세션과 달리 유지됩니다."""
+    return [job_id for job_id in st.query_params.get("jobs", "").split(",") if job_id]
+
+def remember_job(job_id):
+    """새 작업 ID를 목록 맨 앞에 추가합니다. URL이 너무 길어지지 않도록 최근 작업만 남깁니다."""
+    st.query_params["jobs"] = ",".join([job_id] + remembered_jobs()[:MAX_REMEMBERED_JOBS - 1])
+
+def render_jobs(job_ids):
+    """번역 작업의 상태를 표시합니다. 진행 중인 작업만 2초마다 다시 그리고, 끝난 작업은 한 번만 그립니다."""
+    manager = get_job_manager()
+    st.subheader("번역 작업")
+    jobs = [job for job in (manager.store.get(job_id) for job_id in job_ids) if job is not None]
+    active_ids = [job["id"] for job in jobs if job["status"] in (QUEUED, RUNNING)]
+    if active_ids:
+        render_active_jobs(active_ids)
+    for job in jobs:
+        if job["id"] not in active_ids:
+            render_finished_job(manager, job)
+
+@st.fragment(run_every=2)
+def render_active_jobs(job_ids):
+    """진행 중인 작업의 진행 상황. 이 영역만 2초마다 다시 그리며, 작업이 끝나면 전체를 다시 그립니다."""
+    manager = get_job_manager()
+    for job_id in job_ids:
+        job = manager.store.get(job_id)
+        if job is None or job["status"] not in (QUEUED, RUNNING):
+            # 끝난 작업은 주기적으로 갱신하지 않는 영역으로 옮김
+            st.rerun()
+        st.write(f"**{job['file_name']}** → {', '.join(job['target_langs'])}")
+        st.progress(job["progress"], text=job["message"] or "대기 중...")
+        if job["status"] == RUNNING:
+            render_preview(manager, job)
+            render_partial_download(manager, job)
+
+@st.cache_data(max_entries=MAX_REMEMBERED_JOBS, show_spinner=False)
+def load_output(job_id, output_name, completed_at):
+    """완료된 작업의 결과 파일. 다시 시도하기 전에는 바뀌지 않으므로 (작업, 파일, 완료 시각)별로 한 번만 읽습니다."""
+    return get_job_manager().read_output(job_id)
+
+def render_finished_job(manager, job):
+    st.write(f"**{job['file_name']}** → {', '.join(job['target_langs'])}")
+    if job["status"] == COMPLETED:
+        st.success(job["message"])
+        result = load_output(job["id"], job["output_name"], job["updated_at"])
+        st.download_button(
+            label="번역된 문서 다운로드",
+            data=result["data"],
+            file_name=result["file_name"],
+            mime=result["mime"],
+            type="primary",
+            key=f"download_{job['id']}"
+        )
+        # 번역되지 않은 세그먼트가 남았으면 체크포인트에서 이어서 나머지만 다시 번역
+        if job["missing"] and st.button("미번역 세그먼트 다시 시도", key=f"retry_{job['id']}"):
+            manager.retry(job["id"])
+            st.rerun()
+    else:
+        st.error(f"번역 실패: {job['error']}")
+        if st.button("이어서 다시 시도", key=f"retry_{job['id']}"):
+            manager.retry(job["id"])
+            st.rerun()
+
+def render_preview(manager, job):
+    """최근에 번역된 세그먼트를 원문과 나란히 보여줍니다."""
+    preview = manager.store.load_preview(job["id"])
+    if not preview:
+        return
+    with st.expander("번역 미리보기 (최근 번역된 세그먼트)"):
+        langs = [lang for lang in job["target_langs"] if lang in preview]
+        for tab, lang in zip(st.tabs(langs), langs):
+            with tab:
+                st.dataframe(
+                    [
+                        {"원문": strip_tags(row["source"]), "번역문": strip_tags(row["translation"])}
+                        for row in preview[lang]
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+def render_partial_download(manager, job):
+    """버튼을 누르면 지금까지 번역된 내용으로 중간 결과 문서를 만들어 내려받을 수 있게 합니다."""
+    key = f"partial_{job['id']}"
+    if st.button("현재까지 번역된 문서 만들기", key=f"build_{key}"):
+        try:
+            st.session_state[key] = manager.read_partial(job["id"])
+        except Exception as e:
+            logger.error(f"중간 결과 문서 생성 중 오류 발생: {str(e)}")
+            st.error(f"중간 결과 문서를 만드는 중 오류가 발생했습니다: {str(e)}")
+    result = st.session_state.get(key)
+    if result:
+        st.download_button(
+            label=f"중간 결과 다운로드 (세그먼트 {result['translated']}/{result['total']}개 번역됨)",
+            data=result["data"],
+            file_name=result["file_name"],
+            mime=result["mime"],
+            key=f"download_{key}"
+        )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 추가 OpenAI 호환 백엔드 설정 파일 (없으면 기본 제공자만 사용)
+DEFAULT_BACKENDS_PATH = os.getenv("TRANSLATION_BACKENDS_PATH", "backends.json")
+
+REQUIRED_FIELDS = ("name", "base_url", "model")
+
+
+class Backend:
+    """설정 파일로 추가하는 OpenAI 호환(chat.completions) 번역 백엔드 하나."""
+
+    def __init__(self, name: str, base_url: str, model: str, api_key_env: Optional[str] = None,
+                 price_input: float = 0.0, price_output: float = 0.0, max_concurrency: int = 4,
+                 rpm: int = 0, tpm: int = 0, json_mode: bool = True, languages: Optional[List[str]] = None):
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.api_key_env = api_key_env
+        # 100만 토큰당 가격(USD)
+        self.price_input = float(price_input)
+        self.price_output = float(price_output)
+        self.max_concurrency = int(max_concurrency)
+        self.rpm = int(rpm)
+        self.tpm = int(tpm)
+        # response_format(json_object)을 지원하지 않는 서버는 false로 설정
+        self.json_mode = bool(json_mode)
+        # 이 백엔드로 번역할 언어 (없으면 모든 언어)
+        self.languages = languages
+
+    @property
+    def api_key(self) -> str:
+        # 키가 필요 없는 로컬 서버도 있으므로 비어 있으면 자리 표시용 값을 사용
+        return (os.getenv(self.api_key_env) if self.api_key_env else None) or "none"
+
+    def serves(self, target_lang: str) -> bool:
+        return not self.languages or target_lang in self.languages
+
+
+def load_backends(path: Optional[str] = None, builtin_names=()) -> List[Backend]:
+    """설정 파일에서 백엔드 목록을 읽습니다. 파일이 없으면 빈 목록을 반환합니다.
+
+    파일 형식: [{"name": "...", "base_url": "...", "model": "...", "api_key_env": "...", ...}]
+    """
+    path = path or DEFAULT_BACKENDS_PATH
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        entries = json.load(file)
+    if not isinstance(entries, list):
+        raise ValueError(f"백엔드 설정은 목록이어야 합니다: {path}")
+
+    backends: Dict[str, Backend] = {}
+    for entry in entries:
+        missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+        if missing:
+            raise ValueError(f"백엔드 설정에 필수 항목이 없습니다: {', '.join(missing)} ({entry})")
+        if entry["name"] in builtin_names or entry["name"] in backends:
+            raise ValueError(f"백엔드 이름이 중복됩니다: {entry['name']}")
+        try:
+            backends[entry["name"]] = Backend(**entry)
+        except TypeError as e:
+            raise ValueError(f"백엔드 설정 항목이 올바르지 않습니다: {str(e)}") from e
+    logger.info(f"추가 백엔드 {len(backends)}개 로드 - {list(backends)}")
+    return list(backends.values())
@@ -0,0 +1,55 @@
+import json
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from inline_format import tags_match
+
+logger = logging.getLogger(__name__)
+
+# 응답을 감싼 코드 블록(```json ... ```) 제거용
+CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+def encode_batch(segments: List[Tuple[str, str]]) -> str:
+    """(id, 텍스트) 목록을 요청용 JSON 문자열로 변환합니다."""
+    payload = {"segments": [{"id": segment_id, "text": text} for segment_id, text in segments]}
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def decode_batch(request: str) -> List[str]:
+    """encode_batch로 만든 요청 JSON에서 세그먼트 텍스트만 꺼냅니다."""
+    return [segment["text"] for segment in json.loads(request)["segments"]]
+
+
+def parse_batch_response(raw: str, sources: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    """모델 응답을 검증하여 (id별 번역, 누락되거나 잘못된 id 목록)을 반환합니다."""
+    translations = {}
+    try:
+        data = json.loads(CODE_FENCE_PATTERN.sub("", raw.strip()))
+        items = data.get("translations", []) if isinstance(data, dict) else data
+    except (json.JSONDecodeError, AttributeError) as e:
+        logger.warning(f"배치 응답 JSON 파싱 실패: {str(e)}")
+        items = []
+
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        segment_id = str(item.get("id", ""))
+        text = item.get("text")
+        if segment_id not in sources or not isinstance(text, str) or not text.strip():
+            continue
+        # 세그먼트별 번역 거부는 누락으로 보고 다시 요청 (단일 요청의 Failover와 같은 기준)
+        if text.strip() == "번역 불가":
+            continue
+        # 원문이 그대로 돌아온 경우는 번역되지 않은 것으로 간주
+        if text.strip() == sources[segment_id].strip() and HANGUL_PATTERN.search(text):
+            continue
+        # 서식 태그가 빠지거나 깨진 경우도 다시 요청
+        if not tags_match(sources[segment_id], text):
+            continue
+        translations[segment_id] = text.strip()
+
+    missing = [segment_id for segment_id in sources if segment_id not in translations]
+    return translations, missing
@@ -0,0 +1,158 @@
+"""디렉터리의 Word 문서를 여러 언어로 일괄 번역하는 명령줄 도구입니다.
+
+사용 예:
+    PYTHONPATH=src python -m batch_translate ./contracts -l en ja zh -o ./data/translated -w 4
+
+개정판은 이전 결과와 비교하여 바뀐 세그먼트만 번역할 수 있습니다:
+    PYTHONPATH=src python -m batch_translate ./contracts_v2 -l en -o ./data/translated --incremental
+    PYTHONPATH=src python -m batch_translate ./contracts_v2 -l en -o ./data/v2 \
+        --previous-source ./contracts_v1 --previous-output ./data/v1
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from progress import LoggingProgressReporter
+from revision import load_manifest, pair_previous_translations, save_manifest, translate_revision
+from streaming_docx import translate_docx_streaming
+from translator import LANGUAGE_CODES, SUPPORTED_LANGUAGES, get_translator
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_language(value: str) -> str:
+    """언어 코드(en) 또는 표시 이름(영어)을 표시 이름으로 변환합니다."""
+    if value in LANGUAGE_CODES:
+        return LANGUAGE_CODES[value]
+    if value in SUPPORTED_LANGUAGES:
+        return value
+    raise argparse.ArgumentTypeError(
+        f"지원하지 않는 언어입니다: {value} (사용 가능: {', '.join(LANGUAGE_CODES)})"
+    )
+
+
+def language_code(target_lang: str) -> str:
+    """표시 이름에 해당하는 언어 코드를 반환합니다."""
+    return next(code for code, name in LANGUAGE_CODES.items() if name == target_lang)
+
+
+def find_documents(input_path: str) -> list:
+    """입력 경로에서 번역할 .docx 파일 목록을 찾습니다. (Word 임시 파일 제외)"""
+    if os.path.isfile(input_path):
+        return [input_path]
+    return sorted(
+        os.path.join(input_path, name)
+        for name in os.listdir(input_path)
+        if name.lower().endswith(".docx") and not name.startswith("~$")
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Word 문서를 여러 언어로 일괄 번역합니다.")
+    parser.add_argument("input", help="번역할 .docx 파일 또는 파일이 들어 있는 디렉터리")
+    parser.add_argument("-l", "--languages", nargs="+", type=resolve_language, default=["영어"],
+                        help="대상 언어 코드 또는 이름 (기본값: en)")
+    parser.add_argument("-o", "--output-dir", default=os.path.join("data", "translated"),
+                        help="번역 결과를 저장할 디렉터리 (언어 코드별 하위 디렉터리 생성)")
+    parser.add_argument("-w", "--workers", type=int, default=2,
+                        help="동시에 번역할 파일 수 (기본값: 2)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="문서 전체를 메모리에 올리지 않고 본문 XML을 스트리밍으로 처리 (대용량 문서용)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="출력 디렉터리에 저장된 이전 매니페스트와 비교하여 바뀐 세그먼트만 번역")
+    parser.add_argument("--previous-source",
+                        help="이전 원문 .docx 파일 또는 디렉터리 (--previous-output과 함께 사용)")
+    parser.add_argument("--previous-output",
+                        help="이전 번역 결과 디렉터리 (언어 코드별 하위 디렉터리 구조)")
+    args = parser.parse_args(argv)
+    if bool(args.previous_source) != bool(args.previous_output):
+        parser.error("--previous-source와 --previous-output은 함께 지정해야 합니다.")
+    return args
+
+
+def manifest_path(output_dir: str, target_lang: str, name: str) -> str:
+    """번역 결과 옆에 저장하는 세그먼트 매니페스트 경로."""
+    return os.path.join(output_dir, language_code(target_lang), f"{name}.manifest.json")
+
+
+def load_previous(args, path: str) -> dict:
+    """파일 하나의 언어별 이전 번역 {정규화된 원문: 번역문}을 불러옵니다."""
+    name = os.path.basename(path)
+    previous = {}
+    for target_lang in args.languages:
+        if args.previous_source:
+            previous_source = (
+                os.path.join(args.previous_source, name) if os.path.isdir(args.previous_source)
+                else args.previous_source
+            )
+            previous_translated = os.path.join(args.previous_output, language_code(target_lang), name)
+            if os.path.exists(previous_source) and os.path.exists(previous_translated):
+                previous[target_lang] = pair_previous_translations(previous_source, previous_translated)
+            else:
+                logger.warning(f"이전 번역을 찾을 수 없어 전체를 번역합니다: {name} → {language_code(target_lang)}")
+        elif args.incremental:
+            previous[target_lang] = load_manifest(manifest_path(args.output_dir, target_lang, name))
+    return previous
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    documents = find_documents(args.input)
+    if not documents:
+        logger.error(f"번역할 .docx 파일이 없습니다: {args.input}")
+        return 1
+
+    logger.info(f"일괄 번역 시작 - 파일 {len(documents)}개 x 언어 {len(args.languages)}개, 파일 작업자 {args.workers}개")
+
+    # 제공자별 요청 한도를 모든 파일이 함께 지키도록 번역기는 하나만 사용
+    translator = get_translator()
+
+    def translate_one(path: str) -> list:
+        """파일 하나를 한 번만 분석하여 모든 대상 언어로 번역하고 저장합니다."""
+        name = os.path.basename(path)
+        output_paths = {}
+        for target_lang in args.languages:
+            output_dir = os.path.join(args.output_dir, language_code(target_lang))
+            os.makedirs(output_dir, exist_ok=True)
+            output_paths[target_lang] = os.path.join(output_dir, name)
+        progress_factory = lambda lang: LoggingProgressReporter(f"{name} → {language_code(lang)}")
+
+        # 이전 번역이 없으면 모든 세그먼트를 번역
+        if args.streaming:
+            manifests = translate_docx_streaming(
+                translator, path, args.languages, output_paths, load_previous(args, path), progress_factory
+            )
+        else:
+            translated_docs, manifests = translate_revision(
+                translator, path, args.languages, load_previous(args, path), progress_factory
+            )
+            for target_lang, translated_doc in translated_docs.items():
+                translated_doc.save(output_paths[target_lang])
+
+        # 다음 개정판을 --incremental로 번역할 수 있도록 매니페스트도 저장
+        for target_lang in args.languages:
+            save_manifest(manifest_path(args.output_dir, target_lang, name), target_lang, manifests[target_lang])
+        return list(output_paths.values())
+
+    start_time = time.time()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(translate_one, path): path for path in documents}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                for output_path in future.result():
+                    logger.info(f"저장 완료: {output_path}")
+            except Exception as e:
+                failures += 1
+                logger.error(f"번역 실패 - 파일: {path}, 오류: {str(e)}")
+
+    logger.info(f"일괄 번역 종료 - 성공 {len(documents) - failures}건, 실패 {failures}건, 소요 시간 {time.time() - start_time:.1f}초")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
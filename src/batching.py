@@ -0,0 +1,115 @@
+import os
+import re
+import logging
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 배치 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_TOKEN_BUDGET = int(os.getenv("TRANSLATE_BATCH_TOKEN_BUDGET", "2000"))
+DEFAULT_MAX_SEGMENTS = int(os.getenv("TRANSLATE_BATCH_MAX_SEGMENTS", "40"))
+
+# 제공자별 토큰 환산 계수 (한글 1글자당 토큰 수, 그 외 문자 1글자당 토큰 수)
+# 각 제공자의 토크나이저로 한국어 계약서 샘플을 측정하여 보정한 값입니다.
+TOKENS_PER_CHAR = {
+    "openai": (0.9, 0.27),
+    "gemini": (0.7, 0.25),
+    "deepseek": (1.1, 0.3),
+}
+
+# 배치에 세그먼트를 추가할 때마다 붙는 구분자 비용
+SEPARATOR_TOKENS = 8
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+# 문장 경계 (구분자를 함께 돌려받아 줄바꿈을 되살릴 수 있도록 캡처 그룹으로 둠)
+SENTENCE_BOUNDARY = re.compile(r"((?<=[.!?。！？])\s+|\n+)")
+# 서식 태그(inline_format)의 여는 태그와 닫는 태그. 태그 구간 안에서는 문장을 나누지 않음
+OPEN_TAG_PATTERN = re.compile(r"<\d+>")
+CLOSE_TAG_PATTERN = re.compile(r"</\d+>")
+
+
+def estimate_tokens(text: str, provider: str = "openai") -> int:
+    """문자 수를 기반으로 제공자별 토큰 수를 추정합니다."""
+    hangul_rate, other_rate = TOKENS_PER_CHAR.get(provider, TOKENS_PER_CHAR["openai"])
+    hangul = len(HANGUL_PATTERN.findall(text))
+    return int(hangul * hangul_rate + (len(text) - hangul) * other_rate) + 1
+
+
+def split_sentences(text: str, max_tokens: int, provider: str = "openai") -> Tuple[List[str], List[str]]:
+    """토큰 예산을 넘는 텍스트를 문장 경계에서 나눕니다. (조각 목록, 조각마다 뒤에 오던 구분자 목록)을 반환합니다.
+
+    <1>...</1> 같은 서식 태그 구간 안의 경계에서는 나누지 않으므로, 조각마다 태그 짝이 온전히 남습니다.
+    구분자는 join_pieces로 번역된 조각을 다시 합칠 때 줄바꿈을 되살리는 데 사용합니다.
+    """
+    if estimate_tokens(text, provider) <= max_tokens:
+        return [text], [""]
+
+    # [문장, 구분자, 문장, 구분자, ..., 문장]
+    parts = SENTENCE_BOUNDARY.split(text)
+    sentences = []  # [문장, 뒤에 오는 구분자]
+    open_tags = 0
+    for idx in range(0, len(parts), 2):
+        sentence = parts[idx]
+        separator = parts[idx + 1] if idx + 1 < len(parts) else ""
+        if not sentence.strip():
+            # 빈 문장의 구분자는 앞 문장의 구분자에 합침
+            if sentences:
+                sentences[-1][1] += sentence + separator
+            continue
+        # 앞 문장에서 열린 태그가 아직 닫히지 않았으면 이어 붙임
+        if open_tags > 0:
+            sentences[-1] = [sentences[-1][0] + sentences[-1][1] + sentence, separator]
+        else:
+            sentences.append([sentence, separator])
+        open_tags += len(OPEN_TAG_PATTERN.findall(sentence)) - len(CLOSE_TAG_PATTERN.findall(sentence))
+
+    pieces, separators = [], []
+    current, current_separator = "", ""
+    for sentence, separator in sentences:
+        candidate = current + current_separator + sentence if current else sentence
+        if current and estimate_tokens(candidate, provider) > max_tokens:
+            pieces.append(current)
+            separators.append(current_separator)
+            current = sentence
+        else:
+            current = candidate
+        current_separator = separator
+    if current:
+        pieces.append(current)
+        separators.append("")
+    return pieces, separators
+
+
+def join_pieces(pieces: List[str], separators: List[str], joiner: str = " ") -> str:
+    """번역된 조각을 원문의 구분자로 다시 합칩니다.
+
+    줄바꿈이 있던 자리는 그대로 되살리고, 문장 사이의 공백은 대상 언어의 joiner(공백 또는 빈 문자열)로 바꿉니다.
+    """
+    text = ""
+    for piece, separator in zip(pieces, separators):
+        text += piece + (separator if "\n" in separator else joiner if separator else "")
+    return text
+
+
+def pack_batches(items: List[Tuple[Any, str]], token_budget: int = None,
+                 max_segments: int = None, provider: str = "openai") -> List[List[Tuple[Any, str]]]:
+    """(키, 텍스트) 목록을 순서대로 토큰 예산까지 채운 배치로 묶습니다."""
+    token_budget = token_budget or DEFAULT_TOKEN_BUDGET
+    max_segments = max_segments or DEFAULT_MAX_SEGMENTS
+
+    batches = []
+    current = []
+    current_tokens = 0
+    for item in items:
+        tokens = estimate_tokens(item[1], provider) + SEPARATOR_TOKENS
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+
+    logger.info(f"배치 구성 완료 - 세그먼트 {len(items)}개 → 요청 {len(batches)}건 (예산 {token_budget} 토큰)")
+    return batches
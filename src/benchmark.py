@@ -0,0 +1,253 @@
+"""모의 제공자로 문서 번역 처리량을 측정하는 오프라인 벤치마크입니다.
+
+사용 예:
+    PYTHONPATH=src python -m benchmark --paragraphs 2000 --tables 20 -l en ja --latency 0.4 --rate-limit-rate 0.05
+    PYTHONPATH=src python -m benchmark --runs 2 --json results.json   # 두 번째 실행으로 캐시 효과 측정
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from docx import Document
+
+from batch_translate import resolve_language
+from mock_provider import MockProvider, install_mock_providers
+from progress import ProgressReporter
+from router import OBJECTIVES, ProviderRouter
+from streaming_docx import iter_streamed_segments, translate_docx_streaming
+from translation_memory import TranslationMemory
+from translator import DocumentTranslator
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS = ["계약 당사자", "공급자", "구매자", "본 제품", "유지보수 서비스", "납품 일정", "검수 절차", "보증 기간"]
+PREDICATES = [
+    "은 별도 합의가 없는 한 본 계약의 조건을 따른다", "의 책임 범위는 부속서에 명시한다",
+    "에 관한 세부 사항은 상호 협의하여 정한다", "은 서면 통지 후 30일 이내에 이행되어야 한다",
+    "의 변경은 양 당사자의 서면 동의가 필요하다", "에 대한 비용은 공급자가 부담한다",
+]
+CELL_VALUES = ["해당 없음", "완료", "검토 중", "승인 대기", "1,200", "2024-03-01", "반려"]
+
+
+def korean_sentence(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)}{rng.choice(PREDICATES)}."
+
+
+def generate_document(path: str, paragraphs: int = 500, tables: int = 10, rows: int = 20, cols: int = 5,
+                      repeat_ratio: float = 0.3, seed: int = 0) -> str:
+    """표와 단락이 많은 합성 한국어 .docx를 만듭니다. repeat_ratio만큼은 앞에 나온 단락을 반복합니다."""
+    rng = random.Random(seed)
+    doc = Document()
+    written: List[str] = []
+    paragraphs_per_table = max(1, paragraphs // (tables + 1))
+    for idx in range(paragraphs):
+        if written and rng.random() < repeat_ratio:
+            text = rng.choice(written)
+        else:
+            text = " ".join(korean_sentence(rng) for _ in range(rng.randint(1, 4))) + f" (조항 {idx + 1})"
+            written.append(text)
+        paragraph = doc.add_paragraph()
+        # 일부 단락은 굵은 글씨 구간을 넣어 서식 태그도 함께 측정
+        if rng.random() < 0.2:
+            paragraph.add_run(rng.choice(SUBJECTS)).bold = True
+            paragraph.add_run(" ")
+        paragraph.add_run(text)
+        if tables and (idx + 1) % paragraphs_per_table == 0 and len(doc.tables) < tables:
+            table = doc.add_table(rows=rows, cols=cols)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = rng.choice(SUBJECTS) if c == 0 else rng.choice(CELL_VALUES)
+    doc.save(path)
+    return path
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def peak_rss_mb() -> float:
+    """현재 프로세스의 최대 상주 메모리(MB). Linux는 KB, macOS는 바이트 단위로 보고합니다.
+
+    프로세스 전체의 최댓값이므로 실행마다 새 프로세스(measure_run)에서 읽어야 실행별 값이 됩니다.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_translator(args, memory: TranslationMemory, router: ProviderRouter):
+    """모의 제공자를 연결한 번역기를 만듭니다. API 키가 없어도 동작하도록 가짜 키를 채웁니다."""
+    for key in ("OPENAI_API_KEY", "GEMINI_API_KEY", "DEEPSEEK_API_KEY"):
+        os.environ.setdefault(key, "mock")
+    translator = DocumentTranslator(max_workers=args.max_workers, memory=memory, token_budget=args.token_budget,
+                                    prompt_style=args.prompt_style, router=router)
+    latencies = dict(item.split("=", 1) for item in args.provider_latency)
+    providers = {
+        name: MockProvider(
+            name, latency=float(latencies.get(name, args.latency)), latency_sigma=args.latency_sigma, error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate, drop_rate=args.drop_rate, stall_rate=args.stall_rate,
+            seed=args.seed + idx
+        )
+        for idx, name in enumerate(translator.providers.providers)
+    }
+    install_mock_providers(translator, providers)
+    if args.hedge_percentile is not None:
+        translator.providers.hedge_percentile = args.hedge_percentile
+    return translator, providers
+
+
+def run_once(translator, providers: Dict[str, MockProvider], path: str, target_langs: List[str],
+             streaming: bool) -> Dict[str, object]:
+    """문서 하나를 번역하고 측정값을 반환합니다."""
+    before = {name: provider.summary() for name, provider in providers.items()}
+    latency_marks = {name: len(provider.latencies) for name, provider in providers.items()}
+
+    summaries = []
+
+    class SummaryCollector(ProgressReporter):
+        def on_summary(self, summary: dict):
+            summaries.append(summary)
+
+    start = time.time()
+    if streaming:
+        output_dir = tempfile.mkdtemp(prefix="benchmark-")
+        segments = sum(1 for _ in iter_streamed_segments(path))
+        translate_docx_streaming(
+            translator, path, target_langs, {lang: os.path.join(output_dir, f"{idx}.docx")
+                                             for idx, lang in enumerate(target_langs)},
+            progress_factory=lambda lang: SummaryCollector()
+        )
+    else:
+        plan = translator.plan_document(Document(path))
+        segments = len(plan.segments)
+        translator.translate_document_multi(
+            path, target_langs, progress_factory=lambda lang: SummaryCollector(), plan=plan
+        )
+    elapsed = time.time() - start
+
+    totals = {key: 0 for key in next(iter(before.values()))}
+    latencies = []
+    for name, provider in providers.items():
+        for key, value in provider.summary().items():
+            totals[key] += value - before[name][key]
+        latencies.extend(provider.latencies[latency_marks[name]:])
+
+    return {
+        "elapsed_sec": round(elapsed, 2),
+        "segments": segments,
+        "languages": len(target_langs),
+        "segments_per_sec": round(segments * len(target_langs) / elapsed, 1) if elapsed else None,
+        **totals,
+        "p50_latency": round(percentile(latencies, 50) or 0, 3),
+        "p99_latency": round(percentile(latencies, 99) or 0, 3),
+        "cache_hit_rate": translator.memory.stats()["hit_rate"],
+        "hedges": sum(summary["hedges"] for summary in summaries),
+        "hedge_wins": sum(summary["hedge_wins"] for summary in summaries),
+        "prompt_overhead_tokens": sum(summary["prompt_overhead_tokens"] for summary in summaries),
+        "payload_tokens": sum(summary["payload_tokens"] for summary in summaries),
+        "classifier_saved_tokens": sum(summary["saved_tokens"] for summary in summaries),
+        "cost_usd": round(sum(summary["cost_usd"] for summary in summaries), 4),
+    }
+
+
+def measure_run(args, path: str, workdir: str, run: int, results) -> None:
+    """새 프로세스에서 번역을 한 번 실행하고 측정값을 results 큐에 넣습니다.
+
+    합성 문서 생성이나 이전 실행의 메모리 사용량이 최대 메모리에 섞이지 않도록 실행마다 프로세스를 나눕니다.
+    번역 메모리와 라우터 통계는 workdir의 파일로 다음 실행에 이어집니다.
+    """
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    # 실행마다 같은 오류/지연이 반복되지 않도록 난수 시드를 바꿈
+    args.seed += run * 1000
+    memory = TranslationMemory(db_path=os.path.join(workdir, "memory.sqlite3"))
+    router = ProviderRouter(args.objective, db_path=os.path.join(workdir, "router_stats.sqlite3"), seed=args.seed)
+    translator, providers = build_translator(args, memory, router)
+    result = run_once(translator, providers, path, args.languages, args.streaming)
+    router.flush()
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    results.put(result)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="모의 제공자로 문서 번역 성능을 측정합니다.")
+    parser.add_argument("--document", help="측정할 .docx (지정하지 않으면 합성 문서를 생성)")
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument("--tables", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="반복되는 단락 비율 (중복 제거 효과 측정)")
+    parser.add_argument("-l", "--languages", nargs="+", type=resolve_language, default=["영어"])
+    parser.add_argument("--latency", type=float, default=0.5, help="모의 응답 지연 중앙값(초)")
+    parser.add_argument("--provider-latency", nargs="*", default=[], metavar="NAME=SEC",
+                        help="제공자별 지연 시간 중앙값 (예: openai=1.5), 라우팅 비교용")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="지연 시간 로그 정규 분포의 sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="응답이 멈추는(매우 느린) 요청 비율")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="배치 응답에서 세그먼트를 빠뜨리는 비율")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--token-budget", type=int, default=None)
+    parser.add_argument("--prompt-style", choices=["full", "compact", "auto"], default=None,
+                        help="프롬프트 형식 (기본값은 PROMPT_STYLE 환경 변수)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default=None,
+                        help="라우팅 목표 (기본값은 ROUTER_OBJECTIVE 환경 변수)")
+    parser.add_argument("--hedge-percentile", type=float, default=None, help="헤지 요청 기준 백분위수 (0이면 끔)")
+    parser.add_argument("--streaming", action="store_true", help="스트리밍 XML 경로로 측정")
+    parser.add_argument("--runs", type=int, default=1, help="같은 번역 메모리로 반복할 횟수 (2회차부터 캐시 효과)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("-v", "--verbose", action="store_true", help="번역 진행 로그 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # 요청마다 남는 INFO 로그가 측정을 방해하지 않도록 기본은 경고 이상만 출력
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    path = args.document or generate_document(
+        os.path.join(workdir, "synthetic.docx"), args.paragraphs, args.tables, args.rows, args.cols,
+        args.repeat_ratio, args.seed
+    )
+    # 번역 메모리와 라우터 통계는 매번 빈 workdir에서 시작해야 결과를 비교할 수 있음
+    # (--runs로 반복하면 캐시와 라우터 통계가 쌓이는 효과를 볼 수 있음)
+    context = multiprocessing.get_context("spawn")
+    run_results = context.Queue()
+    results = []
+    for run in range(args.runs):
+        process = context.Process(target=measure_run, args=(args, path, workdir, run, run_results))
+        process.start()
+        result = None
+        while result is None:
+            try:
+                result = run_results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    logger.error(f"{run + 1}회차 측정 프로세스가 결과 없이 종료되었습니다 (종료 코드 {process.exitcode}).")
+                    return 1
+        process.join()
+        result["run"] = run + 1
+        results.append(result)
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"config": vars(args), "results": results}, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
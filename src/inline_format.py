@@ -0,0 +1,258 @@
+"""단락의 글자 서식(run)을 번역 후에도 유지하기 위한 자리 표시자 인코딩입니다.
+
+서식이 다른 구간은 <1>...</1>처럼 번호 태그로 감싸 번역 요청에 함께 보내고,
+번역문의 태그를 보고 원래 run 서식(굵게, 글꼴, 하이퍼링크 등)을 다시 입힙니다.
+가장 많이 쓰인 기본 서식 구간은 태그 없이 보내므로, 서식이 하나뿐인 단락은 토큰이 늘지 않습니다.
+
+그림, 각주 참조, 필드(페이지 번호 등)처럼 텍스트가 아닌 요소는 번역하지 않습니다.
+텍스트 사이에 있는 요소는 <3/>처럼 빈 태그로 위치만 알려 번역문의 어순에 맞게 다시 배치하고,
+단락 맨 앞이나 맨 뒤에 있는 요소는 제자리에 그대로 둡니다.
+"""
+import copy
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.text.run import Run
+from lxml import etree
+
+TAG_PATTERN = re.compile(r"</?\d+/?>")
+SPAN_PATTERN = re.compile(r"<(\d+)>(.*?)</\1>", re.DOTALL)
+PLACEHOLDER_PATTERN = re.compile(r"<(\d+)/>")
+PIECE_PATTERN = re.compile(r"<(\d+)>(.*?)</\1>|<(\d+)/>", re.DOTALL)
+
+# 텍스트만 담은 run으로 취급하는 자식 요소 (나머지는 그림 등 고정 요소)
+TEXT_RUN_CHILDREN = {
+    qn("w:rPr"), qn("w:t"), qn("w:tab"), qn("w:br"), qn("w:cr"),
+    qn("w:lastRenderedPageBreak"), qn("w:noBreakHyphen"), qn("w:softHyphen"),
+}
+
+
+class Span:
+    """같은 서식을 가진 연속된 run 묶음, 하이퍼링크 하나, 또는 연속된 고정 요소(그림, 필드 등) 묶음."""
+
+    def __init__(self, kind: str, element, rpr):
+        self.kind = kind
+        self.elements = [element]
+        self.rpr = rpr
+        self.text = ""
+
+    @property
+    def format_key(self) -> bytes:
+        return etree.tostring(self.rpr) if self.rpr is not None else b""
+
+
+def _run_text(paragraph, r) -> str:
+    return Run(r, paragraph).text
+
+
+def _is_text_run(r) -> bool:
+    return all(child.tag in TEXT_RUN_CHILDREN for child in r)
+
+
+def _field_depth_change(r) -> int:
+    change = 0
+    for fld_char in r.iter(qn("w:fldChar")):
+        fld_type = fld_char.get(qn("w:fldCharType"))
+        if fld_type == "begin":
+            change += 1
+        elif fld_type == "end":
+            change -= 1
+    return change
+
+
+def _add_fixed(spans: List[Span], element):
+    if spans and spans[-1].kind == "fixed":
+        spans[-1].elements.append(element)
+    else:
+        spans.append(Span("fixed", element, None))
+
+
+def collect_spans(paragraph) -> List[Span]:
+    """단락의 구간을 문서 순서대로 모읍니다. 필드(begin~end) 전체와 텍스트가 아닌 run은 고정 구간이 됩니다.
+
+    텍스트 구간보다 앞이나 뒤에만 있는 고정 구간은 건드리지 않으므로 결과에서 제외합니다.
+    """
+    spans: List[Span] = []
+    field_depth = 0
+    for child in paragraph._p:
+        if child.tag == qn("w:r"):
+            depth_change = _field_depth_change(child)
+            in_field = field_depth > 0 or depth_change != 0
+            field_depth = max(0, field_depth + depth_change)
+            if in_field or not _is_text_run(child):
+                _add_fixed(spans, child)
+                continue
+            text = _run_text(paragraph, child)
+            if not text:
+                continue
+            rpr = child.find(qn("w:rPr"))
+            last = spans[-1] if spans else None
+            if last is not None and last.kind == "run" and last.format_key == (
+                etree.tostring(rpr) if rpr is not None else b""
+            ):
+                last.elements.append(child)
+            else:
+                last = Span("run", child, rpr)
+                spans.append(last)
+            last.text += text
+        elif child.tag == qn("w:hyperlink"):
+            runs = child.findall(qn("w:r"))
+            if field_depth > 0 or not runs or not all(_is_text_run(r) for r in runs) or len(runs) != len(child):
+                _add_fixed(spans, child)
+                continue
+            span = Span("link", child, runs[0].find(qn("w:rPr")))
+            span.text = "".join(_run_text(paragraph, r) for r in runs)
+            if span.text:
+                spans.append(span)
+
+    while spans and spans[0].kind == "fixed":
+        spans.pop(0)
+    while spans and spans[-1].kind == "fixed":
+        spans.pop()
+    return spans
+
+
+def _base_span_index(spans: List[Span]) -> Optional[int]:
+    """글자 수가 가장 많은 run 서식을 기본 서식으로 정하고, 그 서식의 첫 구간 위치를 반환합니다."""
+    counts = Counter()
+    for span in spans:
+        if span.kind == "run":
+            counts[span.format_key] += len(span.text)
+    if not counts:
+        return None
+    base_key = counts.most_common(1)[0][0]
+    return next(idx for idx, span in enumerate(spans) if span.kind == "run" and span.format_key == base_key)
+
+
+def _tag_ids(spans: List[Span]) -> List[Optional[int]]:
+    """구간별 태그 번호. 기본 서식 구간은 None(태그 없음)입니다."""
+    base_idx = _base_span_index(spans)
+    base_key = spans[base_idx].format_key if base_idx is not None else None
+    ids, next_id = [], 1
+    for span in spans:
+        if span.kind == "run" and span.format_key == base_key:
+            ids.append(None)
+        else:
+            ids.append(next_id)
+            next_id += 1
+    return ids
+
+
+def _encode(spans: List[Span], tag_ids: List[Optional[int]]) -> str:
+    parts = []
+    for span, tag_id in zip(spans, tag_ids):
+        if tag_id is None:
+            parts.append(span.text)
+        elif span.kind == "fixed":
+            parts.append(f"<{tag_id}/>")
+        else:
+            parts.append(f"<{tag_id}>{span.text}</{tag_id}>")
+    return "".join(parts)
+
+
+def encode_paragraph(paragraph) -> str:
+    """단락을 번역 요청용 텍스트로 변환합니다. 기본 서식이 아닌 구간은 번호 태그로 감쌉니다."""
+    spans = collect_spans(paragraph)
+    return _encode(spans, _tag_ids(spans))
+
+
+def has_tags(text: str) -> bool:
+    return TAG_PATTERN.search(text) is not None
+
+
+def strip_tags(text: str) -> str:
+    return TAG_PATTERN.sub("", text)
+
+
+def tags_match(source: str, translated: str) -> bool:
+    """번역문에 원문의 태그가 빠짐없이 한 번씩, 올바르게 짝지어 남아 있는지 확인합니다."""
+    def tag_ids(text):
+        pairs = sorted(match.group(1) for match in SPAN_PATTERN.finditer(text))
+        placeholders = sorted(match.group(1) for match in PLACEHOLDER_PATTERN.finditer(text))
+        return pairs, placeholders
+
+    pairs, placeholders = tag_ids(translated)
+    return (
+        tag_ids(source) == (pairs, placeholders)
+        and len(TAG_PATTERN.findall(translated)) == 2 * len(pairs) + len(placeholders)
+    )
+
+
+def decode_text(text: str) -> List[Tuple[Optional[int], str]]:
+    """번역문을 (태그 번호 또는 None, 텍스트) 조각 목록으로 나눕니다. 빈 태그의 텍스트는 ""입니다."""
+    pieces, pos = [], 0
+    for match in PIECE_PATTERN.finditer(text):
+        if match.start() > pos:
+            pieces.append((None, text[pos:match.start()]))
+        if match.group(3) is not None:
+            pieces.append((int(match.group(3)), ""))
+        else:
+            pieces.append((int(match.group(1)), match.group(2)))
+        pos = match.end()
+    if pos < len(text):
+        pieces.append((None, text[pos:]))
+    return pieces
+
+
+def _new_run(rpr):
+    r = OxmlElement("w:r")
+    if rpr is not None:
+        r.append(copy.deepcopy(rpr))
+    return r
+
+
+def apply_paragraph(paragraph, translated_text: str):
+    """번역문(태그 포함)을 단락에 반영합니다. 태그로 표시한 구간에는 원래 서식을 다시 입힙니다.
+
+    태그가 원문과 맞지 않으면 태그를 지우고 기본 서식으로 반영한 뒤, 고정 구간을 원래 순서대로 뒤에 붙입니다.
+    """
+    spans = collect_spans(paragraph)
+    if not spans:
+        paragraph.add_run(strip_tags(translated_text))
+        return
+
+    tag_ids = _tag_ids(spans)
+    by_id = {tag_id: span for span, tag_id in zip(spans, tag_ids) if tag_id is not None}
+    base_idx = _base_span_index(spans)
+    base_rpr = spans[base_idx].rpr if base_idx is not None else spans[0].rpr
+
+    if tags_match(_encode(spans, tag_ids), translated_text):
+        pieces = decode_text(translated_text)
+    else:
+        pieces = [(None, strip_tags(translated_text))]
+        pieces += [(tag_id, "") for span, tag_id in zip(spans, tag_ids) if span.kind == "fixed"]
+
+    p = paragraph._p
+    anchor = p.index(spans[0].elements[0])
+    for span in spans:
+        for element in span.elements:
+            p.remove(element)
+
+    used_links = set()
+    new_elements = []
+    for tag_id, text in pieces:
+        span = by_id.get(tag_id)
+        if span is not None and span.kind == "fixed":
+            new_elements.extend(span.elements)
+            continue
+        if not text:
+            continue
+        if span is not None and span.kind == "link":
+            # 하이퍼링크는 요소(관계 id 포함)를 재사용하고 안의 run을 하나로 합침
+            link = span.elements[0] if tag_id not in used_links else copy.deepcopy(span.elements[0])
+            used_links.add(tag_id)
+            first_run, *other_runs = link.findall(qn("w:r"))
+            for r in other_runs:
+                link.remove(r)
+            Run(first_run, paragraph).text = text
+            new_elements.append(link)
+        else:
+            r = _new_run(span.rpr if span is not None else base_rpr)
+            Run(r, paragraph).text = text
+            new_elements.append(r)
+
+    for offset, element in enumerate(new_elements):
+        p.insert(anchor + offset, element)
@@ -0,0 +1,401 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from progress import ProgressReporter, format_remaining
+from translator import (DocumentTranslator, apply_translations, document_to_bytes, documents_to_zip, get_translator,
+                        load_document)
+
+logger = logging.getLogger(__name__)
+
+# 작업 큐 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_JOBS_DIR = os.getenv("TRANSLATION_JOBS_DIR", os.path.join("data", "jobs"))
+DEFAULT_JOB_WORKERS = int(os.getenv("TRANSLATION_JOB_WORKERS", "2"))
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobStore:
+    """번역 작업과 세그먼트별 체크포인트를 SQLite에 저장합니다."""
+
+    def __init__(self, jobs_dir: Optional[str] = None):
+        self.jobs_dir = jobs_dir or DEFAULT_JOBS_DIR
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.jobs_dir, "jobs.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                target_langs TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                error TEXT,
+                output_name TEXT,
+                missing INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_segments (
+                job_id TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                group_index INTEGER NOT NULL,
+                translation TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (job_id, target_lang, group_index)
+            )"""
+        )
+        # 미리보기용 원문 열, 미번역 세그먼트 수 열이 없던 이전 버전의 저장소
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(job_segments)")}
+        if "source" not in columns:
+            self._conn.execute("ALTER TABLE job_segments ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "missing" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN missing INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def source_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir(job_id), "source.docx")
+
+    def output_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir(job_id), "output")
+
+    def create(self, file_name: str, file_content: bytes, target_langs: List[str]) -> str:
+        """원본 파일을 저장하고 대기 상태의 작업을 만듭니다."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        with open(self.source_path(job_id), "wb") as file:
+            file.write(file_content)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, file_name, target_langs, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, file_name, json.dumps(target_langs, ensure_ascii=False), QUEUED, now, now)
+            )
+            self._conn.commit()
+        logger.info(f"번역 작업 등록 - id: {job_id}, 파일: {file_name}, 대상 언어: {target_langs}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self) -> Optional[Dict]:
+        """가장 오래된 대기 작업을 실행 상태로 바꾸고 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row["id"])
+            )
+            self._conn.commit()
+        return self._to_dict(row)
+
+    def requeue_interrupted(self) -> int:
+        """프로세스 재시작 등으로 중단된 실행 중 작업을 다시 대기 상태로 돌립니다."""
+        with self._lock:
+            count = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (QUEUED, time.time(), RUNNING)
+            ).rowcount
+            self._conn.commit()
+        return count
+
+    def retry(self, job_id: str):
+        """끝난 작업을 다시 대기 상태로 돌립니다. 체크포인트가 있는 세그먼트는 다시 번역하지 않습니다."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (QUEUED, time.time(), job_id, FAILED, COMPLETED)
+            )
+            self._conn.commit()
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def save_segment(self, job_id: str, target_lang: str, group_index: int, translation: str, source: str = ""):
+        """번역이 끝난 세그먼트 그룹 하나를 체크포인트로 저장합니다. source는 미리보기에 표시할 원문입니다."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_segments (job_id, target_lang, group_index, translation, source) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, target_lang, group_index, translation, source)
+            )
+            self._conn.commit()
+
+    def load_segments(self, job_id: str) -> Dict[str, Dict[int, Tuple[str, str]]]:
+        """저장된 체크포인트를 {언어: {그룹 번호: (번역문, 원문)}}으로 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target_lang, group_index, translation, source FROM job_segments WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        segments = {}
+        for row in rows:
+            segments.setdefault(row["target_lang"], {})[row["group_index"]] = (row["translation"], row["source"])
+        return segments
+
+    def load_preview(self, job_id: str, limit: int = 20) -> Dict[str, List[Dict[str, str]]]:
+        """최근에 번역된 세그먼트를 언어별로 [{source, translation}] (최근 순)으로 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target_lang, source, translation FROM job_segments WHERE job_id = ? ORDER BY rowid DESC",
+                (job_id,)
+            ).fetchall()
+        preview = {}
+        for row in rows:
+            segments = preview.setdefault(row["target_lang"], [])
+            if len(segments) < limit:
+                segments.append({"source": row["source"], "translation": row["translation"]})
+        return preview
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job["target_langs"] = json.loads(job["target_langs"])
+        return job
+
+
+class JobProgressReporter(ProgressReporter):
+    """언어별 진행 상황을 모아 작업의 진행률로 저장합니다. 진행률은 원문 토큰 기준입니다."""
+
+    def __init__(self, store: JobStore, job_id: str, target_langs: List[str]):
+        self.store = store
+        self.job_id = job_id
+        # 언어별 (완료 원문 토큰, 전체 원문 토큰, 출력 토큰 처리 속도, 남은 시간 추정치)
+        self.states = {lang: (0, 0, 0.0, None) for lang in target_langs}
+        self.message = ""
+        self.last_saved = 0.0
+        # 언어별 호출 지표 요약을 더한 작업 전체의 예상 비용
+        self.cost_usd = 0.0
+
+    def for_language(self, target_lang: str) -> ProgressReporter:
+        return LanguageJobReporter(self, target_lang)
+
+    def update(self, target_lang: str, message: str):
+        self.message = message
+        self._save()
+
+    def update_tokens(self, target_lang: str, done_tokens: int, total_tokens: int, tokens_per_sec: float,
+                      remaining: Optional[float]):
+        self.states[target_lang] = (done_tokens, total_tokens, tokens_per_sec, remaining)
+        self._save()
+
+    def _save(self):
+        done = sum(state[0] for state in self.states.values())
+        total_tokens = sum(state[1] for state in self.states.values())
+        # 언어별 번역은 동시에 진행되므로 가장 늦게 끝나는 언어가 작업의 남은 시간
+        estimates = [state[3] for state in self.states.values() if state[1] and state[0] < state[1]]
+        tokens_per_sec = sum(state[2] for state in self.states.values())
+        message = self.message
+        if estimates:
+            remaining = None if None in estimates else max(estimates)
+            message += f" - 남은 시간 {format_remaining(remaining)}, {tokens_per_sec:.0f} 토큰/초"
+        # 너무 잦은 쓰기를 피하기 위해 1초에 한 번만 저장
+        now = time.time()
+        if now - self.last_saved >= 1.0 or (total_tokens and done == total_tokens):
+            self.last_saved = now
+            self.store.update(self.job_id, progress=done / total_tokens if total_tokens else 0.0, message=message)
+
+
+class LanguageJobReporter(ProgressReporter):
+    """한 언어의 진행 이벤트를 JobProgressReporter로 전달합니다."""
+
+    def __init__(self, parent: JobProgressReporter, target_lang: str):
+        self.parent = parent
+        self.target_lang = target_lang
+
+    def on_start(self, total_items: int, total_segments: int, unique_segments: int):
+        self.parent.update(self.target_lang, f"[{self.target_lang}] 번역 시작")
+
+    def on_progress(self, completed: int, total: int, message: str):
+        self.parent.update(self.target_lang, f"[{self.target_lang}] {message}")
+
+    def on_tokens(self, done_tokens: int, total_tokens: int, tokens_per_sec: float, remaining: Optional[float]):
+        self.parent.update_tokens(self.target_lang, done_tokens, total_tokens, tokens_per_sec, remaining)
+
+    def on_error(self, message: str):
+        logger.error(f"작업 {self.parent.job_id} - {message}")
+
+    def on_summary(self, summary: dict):
+        self.parent.cost_usd += summary["cost_usd"]
+
+
+class JobManager:
+    """대기 중인 번역 작업을 백그라운드 작업자 스레드에서 실행합니다."""
+
+    def __init__(self, store: Optional[JobStore] = None, translator: Optional[DocumentTranslator] = None,
+                 workers: Optional[int] = None):
+        self.store = store or JobStore()
+        self.translator = translator
+        self.workers = workers or DEFAULT_JOB_WORKERS
+        self._wake = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """중단된 작업을 다시 대기열에 넣고 작업자 스레드를 시작합니다."""
+        resumed = self.store.requeue_interrupted()
+        if resumed:
+            logger.info(f"중단된 번역 작업 {resumed}건을 이어서 진행합니다.")
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"translation-job-{idx + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, file_name: str, file_content: bytes, target_langs: List[str]) -> str:
+        job_id = self.store.create(file_name, file_content, target_langs)
+        self._wake.set()
+        return job_id
+
+    def retry(self, job_id: str):
+        self.store.retry(job_id)
+        self._wake.set()
+
+    def read_output(self, job_id: str) -> Optional[Dict]:
+        """완료된 작업의 결과 파일을 {file_name, data, mime}으로 반환합니다."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] != COMPLETED:
+            return None
+        with open(self.store.output_path(job_id), "rb") as file:
+            data = file.read()
+        mime = "application/zip" if job["output_name"].endswith(".zip") else DOCX_MIME
+        return {"file_name": job["output_name"], "data": data, "mime": mime}
+
+    def read_partial(self, job_id: str) -> Optional[Dict]:
+        """지금까지 저장된 체크포인트로 만든 중간 결과 문서를 {file_name, data, mime, translated, total}으로 반환합니다.
+
+        아직 번역되지 않은 세그먼트는 원문 그대로 둡니다. 작업 상태와 관계없이 언제든 만들 수 있습니다.
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        translator = self.translator or get_translator()
+        doc = load_document(self.store.source_path(job_id))
+        plan = translator.plan_document(doc)
+        translations = self._checkpoints(job_id, plan)
+        documents = {
+            lang: apply_translations(doc, plan, translations.get(lang, {})) for lang in job["target_langs"]
+        }
+        output_name, data = self._package(job, documents, prefix="partial")
+        return {
+            "file_name": output_name,
+            "data": data,
+            "mime": "application/zip" if output_name.endswith(".zip") else DOCX_MIME,
+            "translated": sum(len(translations.get(lang, {})) for lang in job["target_langs"]),
+            "total": len(plan.groups) * len(job["target_langs"]),
+        }
+
+    def _checkpoints(self, job_id: str, plan) -> Dict[str, Dict[int, str]]:
+        """계획과 원문이 일치하는 체크포인트만 {언어: {그룹 번호: 번역문}}으로 반환합니다.
+
+        재시작 사이에 분류기나 계획 방식이 바뀌면 그룹 번호가 달라질 수 있으므로,
+        같은 번호의 그룹 원문이 저장된 원문과 다르면 그 체크포인트는 버리고 다시 번역합니다.
+        """
+        groups = plan.groups
+        checkpoints = {}
+        stale = 0
+        for lang, segments in self.store.load_segments(job_id).items():
+            for index, (translation, source) in segments.items():
+                if index < len(groups) and groups[index].text == source:
+                    checkpoints.setdefault(lang, {})[index] = translation
+                else:
+                    stale += 1
+        if stale:
+            logger.warning(f"작업 {job_id} - 현재 계획과 원문이 다른 체크포인트 {stale}개는 사용하지 않습니다.")
+        return checkpoints
+
+    @staticmethod
+    def _package(job: Dict, documents: Dict, prefix: str = "translated"):
+        """언어가 하나면 docx, 여러 개면 zip으로 묶어 (파일 이름, 데이터)를 반환합니다."""
+        target_langs = job["target_langs"]
+        if len(target_langs) == 1:
+            return f"{prefix}_{job['file_name']}", document_to_bytes(documents[target_langs[0]])
+        return f"{prefix}_{os.path.splitext(job['file_name'])[0]}.zip", documents_to_zip(documents, job["file_name"])
+
+    def _worker_loop(self):
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wake.wait(timeout=2.0)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict):
+        job_id = job["id"]
+        target_langs = job["target_langs"]
+        translator = self.translator or get_translator()
+        try:
+            doc = load_document(self.store.source_path(job_id))
+            plan = translator.plan_document(doc)
+            done = self._checkpoints(job_id, plan)
+            if done:
+                logger.info(f"작업 {job_id} - 체크포인트에서 이어서 번역합니다.")
+
+            reporter = JobProgressReporter(self.store, job_id, target_langs)
+            documents = translator.translate_document_multi(
+                doc, target_langs,
+                progress_factory=reporter.for_language,
+                plan=plan,
+                done=done,
+                on_group_translated=lambda lang, group, text: self.store.save_segment(
+                    job_id, lang, group.index, text, group.text
+                )
+            )
+
+            # 결과 문서(체크포인트 포함)를 디스크에 저장
+            output_name, data = self._package(job, documents)
+            with open(self.store.output_path(job_id), "wb") as file:
+                file.write(data)
+
+            # 번역되지 않은 세그먼트가 있으면 알려서 다시 시도할 수 있게 함
+            translated = self._checkpoints(job_id, plan)
+            missing = sum(len(plan.groups) - len(translated.get(lang, {})) for lang in target_langs)
+            message = f"번역 완료 (미번역 세그먼트 {missing}개)" if missing else "번역 완료"
+            message += f" - 예상 비용 ${reporter.cost_usd:.4f}"
+            self.store.update(job_id, status=COMPLETED, progress=1.0, message=message, output_name=output_name,
+                              missing=missing)
+            logger.info(f"번역 작업 완료 - id: {job_id}")
+        except Exception as e:
+            logger.error(f"번역 작업 실패 - id: {job_id}, 오류: {str(e)}")
+            self.store.update(job_id, status=FAILED, error=str(e), message="번역 실패")
+
+
+_shared_manager: Optional[JobManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """프로세스 전체에서 공유하는 작업 관리자를 반환합니다. 처음 호출할 때 작업자 스레드를 시작합니다."""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = JobManager()
+            _shared_manager.start()
+        return _shared_manager
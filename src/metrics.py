@@ -0,0 +1,311 @@
+"""제공자 호출별 지표(지연 시간, 토큰, 비용, 재시도/대체 경로, 캐시 적중)를 모읍니다.
+
+- 프로세스 전체 누적값은 METRICS_PORT를 지정하면 HTTP로 노출합니다.
+  (/metrics: Prometheus 텍스트 형식, /metrics.json: JSON)
+- 문서(언어) 하나의 번역 중에는 DocumentMetrics가 contextvars로 작업자 스레드까지 전달되어
+  문서별 요약과 예상 비용을 만듭니다.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 제공자별 100만 토큰당 가격(USD): (입력, 출력). 환경 변수로 조정 가능
+PRICES = {
+    "openai": (float(os.getenv("OPENAI_PRICE_INPUT", "0.15")), float(os.getenv("OPENAI_PRICE_OUTPUT", "0.60"))),
+    "gemini": (float(os.getenv("GEMINI_PRICE_INPUT", "0.10")), float(os.getenv("GEMINI_PRICE_OUTPUT", "0.40"))),
+    "deepseek": (float(os.getenv("DEEPSEEK_PRICE_INPUT", "0.27")), float(os.getenv("DEEPSEEK_PRICE_OUTPUT", "1.10"))),
+}
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# 지연 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+# 이벤트 이름: 캐시 적중/미스, 다른 제공자로 대체, 429 재시도, 배치 누락 재요청,
+# 느린 응답 대신 보낸 헤지 요청과 그중 먼저 응답한 횟수, 진행 중인 같은 요청에 합쳐진 호출
+CACHE_HIT = "cache_hit"
+CACHE_MISS = "cache_miss"
+FALLBACK = "fallback"
+RATE_LIMIT_RETRY = "rate_limit_retry"
+BATCH_RETRY = "batch_retry"
+HEDGE = "hedge"
+HEDGE_WIN = "hedge_win"
+COALESCED = "coalesced"
+
+
+def set_price(provider: str, input_price: float, output_price: float):
+    """설정 파일로 추가한 제공자의 100만 토큰당 가격을 등록합니다."""
+    PRICES[provider] = (input_price, output_price)
+
+
+def estimate_cost(provider: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = PRICES.get(provider, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def usage_tokens(response) -> Tuple[Optional[int], Optional[int]]:
+    """OpenAI 호환 응답(usage)이나 Gemini 응답(usage_metadata)에서 (입력, 출력) 토큰 수를 꺼냅니다."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+    return None, None
+
+
+class DocumentMetrics:
+    """문서(언어) 하나를 번역하는 동안의 호출 지표."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.calls = defaultdict(int)
+        self.failures = defaultdict(int)
+        self.prompt_tokens = defaultdict(int)
+        self.completion_tokens = defaultdict(int)
+        self.events = defaultdict(int)
+        self.overhead_tokens = 0
+        self.payload_tokens = 0
+        # 스트리밍 응답으로 받은 출력 토큰 수 (응답이 끝나기 전에도 늘어남)
+        self.streamed_tokens = 0
+
+    def record_call(self, provider: str, latency: float, prompt_tokens: int, completion_tokens: int, ok: bool):
+        with self._lock:
+            self.latencies.append(latency)
+            self.calls[provider] += 1
+            if not ok:
+                self.failures[provider] += 1
+            self.prompt_tokens[provider] += prompt_tokens
+            self.completion_tokens[provider] += completion_tokens
+
+    def record_event(self, event: str, count: int = 1):
+        with self._lock:
+            self.events[event] += count
+
+    def record_prompt(self, overhead_tokens: int, payload_tokens: int):
+        with self._lock:
+            self.overhead_tokens += overhead_tokens
+            self.payload_tokens += payload_tokens
+
+    def record_stream(self, tokens: int):
+        with self._lock:
+            self.streamed_tokens += tokens
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            cost = sum(
+                estimate_cost(provider, self.prompt_tokens[provider], self.completion_tokens[provider])
+                for provider in self.calls
+            )
+            return {
+                "calls": dict(self.calls),
+                "failures": dict(self.failures),
+                "prompt_tokens": sum(self.prompt_tokens.values()),
+                "completion_tokens": sum(self.completion_tokens.values()),
+                "p50_latency": _percentile(latencies, 50),
+                "p99_latency": _percentile(latencies, 99),
+                "cache_hits": self.events[CACHE_HIT],
+                "cache_misses": self.events[CACHE_MISS],
+                "fallbacks": self.events[FALLBACK],
+                "rate_limit_retries": self.events[RATE_LIMIT_RETRY],
+                "batch_retries": self.events[BATCH_RETRY],
+                "hedges": self.events[HEDGE],
+                "hedge_wins": self.events[HEDGE_WIN],
+                "coalesced": self.events[COALESCED],
+                "prompt_overhead_tokens": self.overhead_tokens,
+                "payload_tokens": self.payload_tokens,
+                "overhead_ratio": (
+                    round(self.overhead_tokens / (self.overhead_tokens + self.payload_tokens), 3)
+                    if self.payload_tokens else None
+                ),
+                "streamed_tokens": self.streamed_tokens,
+                "cost_usd": round(cost, 6),
+            }
+
+
+def _percentile(ordered: List[float], percentile: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))], 3)
+
+
+class MetricsRegistry:
+    """프로세스 전체의 누적 지표."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = defaultdict(int)            # (제공자, 결과) → 횟수
+        self.tokens = defaultdict(int)           # (제공자, 종류) → 토큰 수 (overhead/payload는 추정치)
+        self.cost = defaultdict(float)           # 제공자 → USD
+        self.events = defaultdict(int)           # (이벤트, 제공자) → 횟수
+        self.latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self.latency_sum = defaultdict(float)
+        self.latency_count = defaultdict(int)
+
+    def record_call(self, provider: str, latency: float, prompt_tokens: int, completion_tokens: int, ok: bool):
+        with self._lock:
+            self.calls[(provider, "ok" if ok else "error")] += 1
+            self.tokens[(provider, "prompt")] += prompt_tokens
+            self.tokens[(provider, "completion")] += completion_tokens
+            self.cost[provider] += estimate_cost(provider, prompt_tokens, completion_tokens)
+            buckets = self.latency_buckets[provider]
+            for idx, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    buckets[idx] += 1
+            self.latency_sum[provider] += latency
+            self.latency_count[provider] += 1
+
+    def record_event(self, event: str, provider: str = "", count: int = 1):
+        with self._lock:
+            self.events[(event, provider)] += count
+
+    def record_prompt(self, provider: str, overhead_tokens: int, payload_tokens: int):
+        with self._lock:
+            self.tokens[(provider, "overhead")] += overhead_tokens
+            self.tokens[(provider, "payload")] += payload_tokens
+
+    def to_json(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "calls": [{"provider": p, "outcome": o, "count": c} for (p, o), c in self.calls.items()],
+                "tokens": [{"provider": p, "kind": k, "count": c} for (p, k), c in self.tokens.items()],
+                "cost_usd": {provider: round(cost, 6) for provider, cost in self.cost.items()},
+                "events": [{"event": e, "provider": p, "count": c} for (e, p), c in self.events.items()],
+                "latency": {
+                    provider: {"sum": round(self.latency_sum[provider], 3), "count": self.latency_count[provider]}
+                    for provider in self.latency_count
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP translator_provider_calls_total Provider calls by outcome.",
+                "# TYPE translator_provider_calls_total counter",
+            ]
+            lines += [
+                f'translator_provider_calls_total{{provider="{p}",outcome="{o}"}} {c}'
+                for (p, o), c in self.calls.items()
+            ]
+            lines += ["# HELP translator_tokens_total Tokens used by provider and kind.",
+                      "# TYPE translator_tokens_total counter"]
+            lines += [f'translator_tokens_total{{provider="{p}",kind="{k}"}} {c}' for (p, k), c in self.tokens.items()]
+            lines += ["# HELP translator_cost_usd_total Estimated cost in USD.",
+                      "# TYPE translator_cost_usd_total counter"]
+            lines += [f'translator_cost_usd_total{{provider="{p}"}} {c:.6f}' for p, c in self.cost.items()]
+            lines += ["# HELP translator_events_total Cache, fallback, retry, hedge and coalescing events.",
+                      "# TYPE translator_events_total counter"]
+            lines += [
+                f'translator_events_total{{event="{e}",provider="{p}"}} {c}' for (e, p), c in self.events.items()
+            ]
+            lines += ["# HELP translator_provider_latency_seconds Provider call latency.",
+                      "# TYPE translator_provider_latency_seconds histogram"]
+            for provider, buckets in self.latency_buckets.items():
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'translator_provider_latency_seconds_bucket{{provider="{provider}",le="{bound}"}} {count}')
+                lines.append(
+                    f'translator_provider_latency_seconds_bucket{{provider="{provider}",le="+Inf"}} '
+                    f"{self.latency_count[provider]}"
+                )
+                lines.append(f'translator_provider_latency_seconds_sum{{provider="{provider}"}} {self.latency_sum[provider]:.3f}')
+                lines.append(f'translator_provider_latency_seconds_count{{provider="{provider}"}} {self.latency_count[provider]}')
+            return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 현재 번역 중인 문서의 지표 (작업자 스레드에는 contextvars로 전달)
+_current_document: contextvars.ContextVar[Optional[DocumentMetrics]] = contextvars.ContextVar(
+    "current_document_metrics", default=None
+)
+
+
+def set_current_document(document: DocumentMetrics):
+    return _current_document.set(document)
+
+
+def reset_current_document(token):
+    _current_document.reset(token)
+
+
+def record_call(provider: str, latency: float, prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                ok: bool):
+    """제공자 호출 한 번을 기록합니다."""
+    prompt_tokens, completion_tokens = prompt_tokens or 0, completion_tokens or 0
+    registry.record_call(provider, latency, prompt_tokens, completion_tokens, ok)
+    document = _current_document.get()
+    if document is not None:
+        document.record_call(provider, latency, prompt_tokens, completion_tokens, ok)
+
+
+def record_event(event: str, provider: str = "", count: int = 1):
+    """캐시 적중, 대체, 재시도 같은 이벤트를 기록합니다."""
+    if count <= 0:
+        return
+    registry.record_event(event, provider, count)
+    document = _current_document.get()
+    if document is not None:
+        document.record_event(event, count)
+
+
+def record_prompt(provider: str, overhead_tokens: int, payload_tokens: int):
+    """요청 하나의 프롬프트 고정 부분과 본문 토큰 수(추정치)를 기록합니다."""
+    registry.record_prompt(provider, overhead_tokens, payload_tokens)
+    document = _current_document.get()
+    if document is not None:
+        document.record_prompt(overhead_tokens, payload_tokens)
+
+
+def record_stream(tokens: int):
+    """스트리밍 응답으로 받은 출력 토큰 수를 현재 문서에 기록합니다. (진행률과 남은 시간 추정용)"""
+    document = _current_document.get()
+    if document is not None and tokens > 0:
+        document.record_stream(tokens)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = registry.render_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(registry.to_json(), ensure_ascii=False).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """지표 HTTP 서버를 백그라운드 스레드로 한 번만 시작합니다. 포트가 0이면 시작하지 않습니다."""
+    global _server
+    port = METRICS_PORT if port is None else port
+    with _server_lock:
+        if _server is None and port:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"지표 서버를 시작하지 못했습니다. (포트 {port}): {str(e)}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"지표 서버 시작 - http://0.0.0.0:{port}/metrics")
+        return _server
@@ -0,0 +1,164 @@
+"""실제 API를 호출하지 않는 결정적(시드 고정) 모의 번역 제공자입니다.
+
+translate_with_openai 등과 같은 (text, target_lang, json_mode) 인터페이스를 가지며,
+지연 시간 분포, 응답이 멈추는 비율, 오류율, 429 비율, 배치 응답에서 세그먼트를 빠뜨리는 비율을
+조절할 수 있습니다.
+벤치마크(benchmark.py)에서 배치, 동시성, 캐시 변경의 효과를 비용 없이 비교할 때 사용합니다.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from batching import estimate_tokens
+from metrics import record_call, record_stream
+from progress import report_error
+
+logger = logging.getLogger(__name__)
+
+HANGUL_WORD_PATTERN = re.compile(r"[가-힣]+")
+
+# 멈춘 요청은 지연 시간 중앙값의 이 배수만큼 걸린 뒤 응답
+STALL_FACTOR = 40
+
+
+class MockRateLimitError(Exception):
+    """429 응답을 흉내 내는 오류. rate_limit_retry_after가 인식하도록 status_code를 가집니다."""
+
+    status_code = 429
+    response = None
+
+
+class MockProviderError(Exception):
+    status_code = 500
+
+
+def mock_translate(text: str) -> str:
+    """한글 단어를 길이가 같은 결정적 가짜 번역어로 바꿉니다. 태그, 숫자, 공백은 그대로 둡니다."""
+    return HANGUL_WORD_PATTERN.sub(lambda match: "w" * len(match.group()), text)
+
+
+class MockProvider:
+    """설정한 분포대로 지연, 실패, 429, 누락을 일으키는 모의 제공자."""
+
+    def __init__(self, name: str, latency: float = 0.5, latency_sigma: float = 0.3,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, drop_rate: float = 0.0,
+                 stall_rate: float = 0.0, seed: int = 0, limiter=None):
+        self.name = name
+        # 지연 시간은 중앙값 latency초의 로그 정규 분포 (꼬리가 긴 실제 API 지연과 비슷하게)
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.drop_rate = drop_rate
+        self.stall_rate = stall_rate
+        self.limiter = limiter
+        self.seed = seed
+        self._lock = threading.Lock()
+        # 같은 요청(텍스트)을 몇 번째로 받았는지 (재요청마다 다른 결과가 나오도록)
+        self._attempts: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.dropped_segments = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _random_for(self, text: str) -> random.Random:
+        """요청마다 (시드, 제공자, 텍스트, 재요청 횟수)로 정한 난수 생성기.
+
+        스레드들이 하나의 생성기를 나눠 쓰면 실행 순서에 따라 결과가 달라지므로, 요청 내용만으로 결과를 정합니다.
+        """
+        with self._lock:
+            attempt = self._attempts.get(text, 0)
+            self._attempts[text] = attempt + 1
+        return random.Random(f"{self.seed}:{self.name}:{attempt}:{text}")
+
+    def _draw(self, rng: random.Random):
+        """(지연 시간, 난수)를 뽑습니다."""
+        delay = rng.lognormvariate(0, self.latency_sigma) * self.latency
+        if rng.random() < self.stall_rate:
+            delay = self.latency * STALL_FACTOR
+        return delay, rng.random()
+
+    def _respond(self, text: str, json_mode: bool, prompt: Optional[Tuple[str, str]]) -> str:
+        rng = self._random_for(text)
+        delay, roll = self._draw(rng)
+        time.sleep(delay)
+        input_tokens = estimate_tokens("\n\n".join(prompt) if prompt else text, self.name)
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(delay)
+            self.input_tokens += input_tokens
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            record_call(self.name, delay, 0, 0, ok=False)
+            raise MockRateLimitError(f"{self.name} 모의 요청 한도 초과")
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.failures += 1
+            record_call(self.name, delay, 0, 0, ok=False)
+            raise MockProviderError(f"{self.name} 모의 서버 오류")
+
+        if json_mode:
+            segments = json.loads(text)["segments"]
+            kept = [segment for segment in segments if rng.random() >= self.drop_rate]
+            with self._lock:
+                self.dropped_segments += len(segments) - len(kept)
+            result = json.dumps(
+                {"translations": [{"id": segment["id"], "text": mock_translate(segment["text"])} for segment in kept]},
+                ensure_ascii=False
+            )
+        else:
+            result = mock_translate(text)
+        output_tokens = estimate_tokens(result, self.name)
+        with self._lock:
+            self.output_tokens += output_tokens
+        # 실제 제공자는 스트리밍으로 받으면서 기록하지만, 모의 제공자는 응답 시점에 한 번에 기록
+        record_stream(output_tokens)
+        record_call(self.name, delay, input_tokens, output_tokens, ok=True)
+        return result
+
+    def translate(self, text: str, target_lang: str, json_mode: bool = False,
+                  prompt: Optional[Tuple[str, str]] = None) -> Optional[str]:
+        """translate_with_openai와 같은 방식으로 번역합니다. 실패하면 None을 반환합니다.
+
+        prompt는 실제 요청에 쓰였을 (시스템 프롬프트, 사용자 메시지)이며, 입력 토큰 수 계산에 사용합니다.
+        """
+        try:
+            if self.limiter is None:
+                return self._respond(text, json_mode, prompt)
+            return self.limiter.run(lambda: self._respond(text, json_mode, prompt),
+                                    tokens=2 * estimate_tokens(text, self.name))
+        except Exception as e:
+            logger.error(f"{self.name} 모의 호출 실패: {str(e)}")
+            report_error(f"{self.name} 번역 중 오류 발생: {str(e)}")
+            return None
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "rate_limited": self.rate_limited,
+                "dropped_segments": self.dropped_segments,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+
+def install_mock_providers(translator, providers: Dict[str, MockProvider]):
+    """번역기의 제공자를 모의 제공자로 교체합니다. 요청 한도 제어와 프롬프트는 번역기의 것을 그대로 사용합니다."""
+    for name, provider in providers.items():
+        provider.limiter = translator.limiters.get(name)
+        translator.providers.register(
+            name,
+            lambda text, target_lang, json_mode=False, name=name, provider=provider: provider.translate(
+                text, target_lang, json_mode, prompt=translator.build_prompt(text, target_lang, json_mode, name)
+            )
+        )
@@ -0,0 +1,174 @@
+import contextvars
+import logging
+import queue
+import time
+from datetime import timedelta
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReporter:
+    """번역 진행 이벤트를 받는 기본 인터페이스입니다. 필요한 메서드만 재정의하면 됩니다.
+
+    on_error는 작업자 스레드에서도 호출될 수 있고, 나머지 이벤트는 translate_document를
+    호출한 스레드에서 호출됩니다.
+    """
+
+    def on_start(self, total_items: int, total_segments: int, unique_segments: int):
+        pass
+
+    def on_progress(self, completed: int, total: int, message: str):
+        pass
+
+    def on_tokens(self, done_tokens: int, total_tokens: int, tokens_per_sec: float, remaining: Optional[float]):
+        """원문 토큰 기준 진행 상황을 받습니다. 번역 중에는 응답이 오지 않아도 주기적으로 호출됩니다.
+
+        tokens_per_sec는 스트리밍 응답으로 받은 출력 토큰의 처리 속도이고, remaining은 남은 원문 토큰으로
+        추정한 남은 시간(초)입니다. 아직 추정할 수 없으면 None입니다.
+        """
+        pass
+
+    def on_error(self, message: str):
+        pass
+
+    def on_summary(self, summary: dict):
+        """번역이 끝나면 호출 지표 요약(호출 수, 토큰, 지연 시간, 예상 비용 등)을 받습니다."""
+        pass
+
+    def on_complete(self, elapsed: float):
+        pass
+
+
+class LoggingProgressReporter(ProgressReporter):
+    """진행 상황을 로그로 남기는 보고기. CLI나 백그라운드 작업에서 사용합니다."""
+
+    def __init__(self, label: str = ""):
+        self.label = f"[{label}] " if label else ""
+        # 마지막으로 받은 (출력 토큰 처리 속도, 남은 시간 추정치)
+        self.rate = None
+
+    def on_start(self, total_items: int, total_segments: int, unique_segments: int):
+        logger.info(f"{self.label}번역 시작 - 요청 {total_items}건 (세그먼트 {total_segments}개, 고유 {unique_segments}개)")
+
+    def on_progress(self, completed: int, total: int, message: str):
+        if self.rate is not None and completed < total:
+            tokens_per_sec, remaining = self.rate
+            message += f" - 남은 시간 {format_remaining(remaining)}, {tokens_per_sec:.0f} 토큰/초"
+        logger.info(f"{self.label}{message}")
+
+    def on_tokens(self, done_tokens: int, total_tokens: int, tokens_per_sec: float, remaining: Optional[float]):
+        self.rate = (tokens_per_sec, remaining)
+
+    def on_error(self, message: str):
+        logger.error(f"{self.label}{message}")
+
+    def on_summary(self, summary: dict):
+        logger.info(
+            f"{self.label}호출 {sum(summary['calls'].values())}건, 토큰 {summary['prompt_tokens']}+"
+            f"{summary['completion_tokens']}, 캐시 적중 {summary['cache_hits']}건, "
+            f"프롬프트 고정 부분/본문 토큰 {summary['prompt_overhead_tokens']}/{summary['payload_tokens']}, "
+            f"분류기로 제외한 세그먼트 {summary['skipped_segments'] + summary['pass_through_segments']}건"
+            f"(절약 토큰 {summary['saved_tokens']}), "
+            f"예상 비용 ${summary['cost_usd']:.4f}"
+        )
+
+    def on_complete(self, elapsed: float):
+        logger.info(f"{self.label}번역 완료 - 소요 시간 {elapsed:.1f}초")
+
+
+class QueuedProgressReporter(ProgressReporter):
+    """다른 스레드에서 발생한 진행 이벤트를 큐에 담아 두었다가, drain_events를 호출한 스레드에서 전달합니다."""
+
+    def __init__(self, target: ProgressReporter, events: queue.Queue):
+        self.target = target
+        self.events = events
+
+    def on_start(self, total_items: int, total_segments: int, unique_segments: int):
+        self.events.put((self.target.on_start, (total_items, total_segments, unique_segments)))
+
+    def on_progress(self, completed: int, total: int, message: str):
+        self.events.put((self.target.on_progress, (completed, total, message)))
+
+    def on_tokens(self, done_tokens: int, total_tokens: int, tokens_per_sec: float, remaining: Optional[float]):
+        self.events.put((self.target.on_tokens, (done_tokens, total_tokens, tokens_per_sec, remaining)))
+
+    def on_error(self, message: str):
+        self.target.on_error(message)
+
+    def on_summary(self, summary: dict):
+        self.events.put((self.target.on_summary, (summary,)))
+
+    def on_complete(self, elapsed: float):
+        self.events.put((self.target.on_complete, (elapsed,)))
+
+
+class TokenProgress:
+    """남은 원문 토큰과 실제 출력 토큰 처리 속도로 남은 시간을 추정합니다.
+
+    완료된 요청의 (원문 토큰, 번역문 토큰) 비율로 남은 원문을 출력 토큰 수로 바꾸고,
+    스트리밍으로 받은 출력 토큰의 초당 처리량으로 나눕니다. 완료된 요청 수의 비율로 추정하는 것보다
+    요청마다 길이가 크게 다른 문서에서 정확하고, 응답이 끝나기 전에도 처리 속도가 갱신됩니다.
+    """
+
+    def __init__(self, total_tokens: int):
+        self.total_tokens = total_tokens
+        self.done_tokens = 0
+        self.output_tokens = 0
+        self.start_time = time.monotonic()
+
+    def complete(self, source_tokens: int, output_tokens: int):
+        """완료된 요청 하나를 반영합니다. (번역 메모리 적중이나 실패도 원문은 처리한 것으로 봄)"""
+        self.done_tokens += source_tokens
+        self.output_tokens += output_tokens
+
+    def estimate(self, streamed_tokens: int) -> Tuple[float, Optional[float]]:
+        """(출력 토큰 초당 처리량, 남은 시간 추정치(초))를 반환합니다."""
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        remaining_tokens = max(self.total_tokens - self.done_tokens, 0)
+        if remaining_tokens == 0:
+            return streamed_tokens / elapsed, 0.0
+        tokens_per_sec = streamed_tokens / elapsed
+        if tokens_per_sec > 0:
+            ratio = self.output_tokens / self.done_tokens if self.done_tokens and self.output_tokens else 1.0
+            return tokens_per_sec, remaining_tokens * ratio / tokens_per_sec
+        # 스트리밍 응답이 아직 없으면 (모두 번역 메모리 적중 등) 원문 토큰 처리 속도로 추정
+        if self.done_tokens:
+            return 0.0, remaining_tokens * elapsed / self.done_tokens
+        return 0.0, None
+
+
+def format_remaining(remaining: Optional[float]) -> str:
+    """남은 시간 추정치를 표시용 문자열로 바꿉니다."""
+    return "계산 중" if remaining is None else str(timedelta(seconds=int(remaining)))
+
+
+def drain_events(events: queue.Queue):
+    """큐에 쌓인 진행 이벤트를 현재 스레드에서 모두 전달합니다."""
+    while True:
+        try:
+            handler, args = events.get_nowait()
+        except queue.Empty:
+            return
+        handler(*args)
+
+
+# 현재 문서 번역의 보고기 (작업자 스레드에는 contextvars로 전달)
+_current_reporter: contextvars.ContextVar[Optional[ProgressReporter]] = contextvars.ContextVar(
+    "current_reporter", default=None
+)
+
+
+def set_current_reporter(reporter: ProgressReporter):
+    return _current_reporter.set(reporter)
+
+
+def reset_current_reporter(token):
+    _current_reporter.reset(token)
+
+
+def report_error(message: str):
+    """현재 문서 번역의 보고기로 오류를 전달합니다. 보고기가 없으면 무시합니다."""
+    reporter = _current_reporter.get()
+    if reporter is not None:
+        reporter.on_error(message)
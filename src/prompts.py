@@ -0,0 +1,91 @@
+"""번역 요청 프롬프트를 만듭니다.
+
+제공자 쪽 프롬프트 캐시가 잘 적중하도록, 요청마다 달라지는 대상 언어와 본문은 항상 맨 뒤에 두고
+그 앞부분(시스템 프롬프트와 지시문)은 모든 요청에서 바이트 단위로 같게 유지합니다.
+
+짧은 셀이나 단락은 규칙 전체를 담은 기본 프롬프트가 본문보다 길어지므로,
+대상 언어를 시스템 프롬프트에 넣은 언어별 축약 프롬프트를 사용할 수 있습니다. (PROMPT_STYLE)
+- full: 항상 기본 프롬프트
+- compact: 항상 축약 프롬프트
+- auto: 본문이 기본 프롬프트의 고정 부분보다 짧으면 축약 프롬프트 (기본값)
+"""
+import logging
+import os
+from typing import Tuple
+
+from batch_protocol import decode_batch
+from batching import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PROMPT_STYLE = os.getenv("PROMPT_STYLE", "auto")
+
+SYSTEM_PROMPT = """당신은 전문 번역가입니다.
+다음 규칙을 엄격히 지켜주세요:
+1. 주어진 한국어 텍스트를 정확하고 자연스럽게 번역해주세요.
+2. 전문 용어나 문맥을 고려하여 번역해주세요.
+3. 번역할 때는 원문의 의미와 뉘앙스를 최대한 살려주세요.
+4. 번역 결과만 출력해주세요. 다른 설명이나 주석을 추가하지 마세요.
+5. 번역이 불가능한 경우 "번역 불가"라고만 답변해주세요.
+6. 번역할 때는 원문의 형식(줄바꿈, 들여쓰기, 표 형식 등)을 유지해주세요.
+7. <1>...</1>, <2/>처럼 번호가 붙은 서식 태그는 지우거나 바꾸지 말고, 번역문의 해당 위치에 그대로 유지해주세요."""
+
+BATCH_RULE = (
+    '8. 요청이 {"segments": [{"id": "...", "text": "..."}]} 형식의 JSON이면 각 항목의 text를 번역하고, '
+    'id를 그대로 유지하여 {"translations": [{"id": "...", "text": "..."}]} 형식의 JSON으로만 답변해주세요.'
+)
+
+# 모든 요청에서 같은 고정 부분 (대상 언어와 본문은 이 뒤에 붙음)
+TEXT_SYSTEM_PROMPT = SYSTEM_PROMPT
+JSON_SYSTEM_PROMPT = f"{SYSTEM_PROMPT}\n{BATCH_RULE}"
+USER_PREFIX = "다음 한국어 텍스트를 번역해주세요.\n대상 언어: "
+
+# 축약 프롬프트에 쓰는 언어 이름 (영어 이름이 토큰이 적고 모델이 가장 정확히 인식함)
+COMPACT_LANGUAGE_NAMES = {
+    "중국어 간체": "Simplified Chinese",
+    "영어": "English",
+    "일본어": "Japanese",
+    "베트남어": "Vietnamese",
+    "태국어": "Thai",
+    "인도네시아어": "Indonesian",
+}
+
+
+def compact_system_prompt(target_lang: str, json_mode: bool) -> str:
+    """언어별 축약 시스템 프롬프트. 같은 언어의 요청끼리는 바이트 단위로 같습니다."""
+    language = COMPACT_LANGUAGE_NAMES.get(target_lang, target_lang)
+    prompt = (
+        f"Translate Korean into {language}. Output only the translation; if impossible, output 번역 불가. "
+        "Keep numbered tags like <1>...</1> and <2/> unchanged in place."
+    )
+    if json_mode:
+        prompt += ' Input {"segments":[{"id","text"}]}; reply only JSON {"translations":[{"id","text"}]} with the same ids.'
+    return prompt
+
+
+def use_compact(text: str, style: str = None) -> bool:
+    style = style or PROMPT_STYLE
+    if style == "compact":
+        return True
+    if style == "auto":
+        return estimate_tokens(text) < estimate_tokens(TEXT_SYSTEM_PROMPT)
+    return False
+
+
+def build_prompt(text: str, target_lang: str, json_mode: bool = False, style: str = None) -> Tuple[str, str]:
+    """(시스템 프롬프트, 사용자 메시지)를 반환합니다. json_mode이면 text는 encode_batch로 만든 JSON입니다."""
+    if use_compact(text, style):
+        return compact_system_prompt(target_lang, json_mode), text
+    system = JSON_SYSTEM_PROMPT if json_mode else TEXT_SYSTEM_PROMPT
+    return system, f"{USER_PREFIX}{target_lang}\n\n{text}"
+
+
+def prompt_overhead(system: str, user: str, text: str, json_mode: bool = False,
+                    provider: str = "openai") -> Tuple[int, int]:
+    """요청 하나의 (프롬프트 고정 부분 토큰, 본문 토큰) 추정치.
+
+    json_mode이면 text는 JSON 요청이므로, 세그먼트 원문만 본문으로 세고 id와 JSON 구조는 고정 부분에 넣습니다.
+    """
+    texts = decode_batch(text) if json_mode else [text]
+    payload = sum(estimate_tokens(segment, provider) for segment in texts)
+    return max(0, estimate_tokens(system, provider) + estimate_tokens(user, provider) - payload), payload
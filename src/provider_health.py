@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 서킷 브레이커 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+DEFAULT_RESET_TIMEOUT = float(os.getenv("PROVIDER_RESET_TIMEOUT", "30"))
+DEFAULT_WINDOW_SIZE = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+
+# 헤지 요청 설정: 응답이 최근 성공 지연 시간의 이 백분위수를 넘으면 다음 제공자에 같은 요청을 보냄 (0이면 사용 안 함)
+DEFAULT_HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# 헤지 대기 시간의 하한(초)과, 백분위수를 믿을 수 있는 최소 성공 기록 수
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "10"))
+
+
+class CircuitBreaker:
+    """연속 실패 시 제공자를 차단하고, 일정 시간 후 한 번의 시험 요청으로 복구를 확인합니다."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or DEFAULT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or DEFAULT_RESET_TIMEOUT
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """요청을 보내도 되는지 확인합니다. 반열림 상태에서는 시험 요청 하나만 허용합니다."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def available(self) -> bool:
+        """시험 요청 자리를 차지하지 않고 지금 요청을 보낼 수 있는지만 확인합니다."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """실패를 기록합니다. 이번 실패로 차단되면 True를 반환합니다."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                was_open = self.state == self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                return not was_open
+            return False
+
+
+class ProviderHealth:
+    """제공자 하나의 최근 호출 결과(성공 여부, 지연 시간)를 추적합니다."""
+
+    def __init__(self, name: str, window_size: int = None):
+        self.name = name
+        self.breaker = CircuitBreaker()
+        self._window = deque(maxlen=window_size or DEFAULT_WINDOW_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, latency: float):
+        with self._lock:
+            self._window.append((ok, latency))
+        if ok:
+            self.breaker.record_success()
+        elif self.breaker.record_failure():
+            logger.warning(f"{self.name} 제공자 차단 - 연속 실패 {self.breaker.consecutive_failures}회")
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._window:
+                return 0.0
+            return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    @property
+    def success_count(self) -> int:
+        with self._lock:
+            return sum(1 for ok, _ in self._window if ok)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """성공한 호출의 지연 시간 백분위수를 반환합니다. 기록이 없으면 None."""
+        with self._lock:
+            latencies = sorted(latency for ok, latency in self._window if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "state": self.breaker.state,
+            "error_rate": round(self.error_rate, 3),
+            "p50_latency": self.latency_percentile(50),
+            "p95_latency": self.latency_percentile(95),
+        }
+
+
+class ProviderRegistry:
+    """번역 제공자와 상태를 등록하고, 정상 제공자만 골라 호출 순서를 정합니다."""
+
+    def __init__(self, hedge_percentile: float = None):
+        self.providers: Dict[str, Callable] = {}
+        self.health: Dict[str, ProviderHealth] = {}
+        self.hedge_percentile = DEFAULT_HEDGE_PERCENTILE if hedge_percentile is None else hedge_percentile
+
+    def register(self, name: str, translate: Callable):
+        self.providers[name] = translate
+        self.health[name] = ProviderHealth(name)
+
+    def route(self, preferred_order: List[str]) -> List[str]:
+        """선호 순서에서 차단된 제공자를 건너뛴 호출 순서를 반환합니다.
+
+        반열림 상태의 시험 요청 자리는 여기서 차지하지 않습니다. 실제로 호출하기 직전에 acquire로 차지합니다.
+        """
+        order = []
+        for name in dict.fromkeys(preferred_order):
+            if name in self.providers and self.health[name].breaker.available():
+                order.append(name)
+            elif name in self.providers:
+                logger.info(f"{name} 제공자는 차단 상태이므로 건너뜁니다.")
+        if not order:
+            # 모두 차단된 경우 가장 먼저 차단된 제공자로 한 번 시도
+            fallback = min(
+                (name for name in preferred_order if name in self.providers),
+                key=lambda name: self.health[name].breaker.opened_at,
+                default=None
+            )
+            if fallback:
+                order.append(fallback)
+        return order
+
+    def acquire(self, name: str) -> bool:
+        """name을 지금 호출해도 되는지 확인합니다. 반열림 상태이면 하나뿐인 시험 요청 자리를 차지합니다.
+
+        True를 받았으면 반드시 call로 호출해야 결과가 기록되어 자리가 풀립니다.
+        """
+        return self.health[name].breaker.allow_request()
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """name의 응답을 기다릴 시간(초). 지나면 헤지 요청을 보냅니다. 기록이 부족하거나 헤지를 끄면 None."""
+        health = self.health[name]
+        if self.hedge_percentile <= 0 or health.success_count < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, health.latency_percentile(self.hedge_percentile))
+
+    def call(self, name: str, *args, **kwargs):
+        """제공자를 호출하고 결과와 지연 시간을 기록합니다. 실패 시 None을 반환합니다."""
+        start = time.time()
+        result = self.providers[name](*args, **kwargs)
+        self.health[name].record(result is not None, time.time() - start)
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        return {name: health.summary() for name, health in self.health.items()}
@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from metrics import RATE_LIMIT_RETRY, record_event
+
+logger = logging.getLogger(__name__)
+
+# 제공자별 분당 요청 수(RPM)와 분당 토큰 수(TPM) 한도 (0이면 제한 없음)
+DEFAULT_RATE_LIMITS = {
+    "openai": (int(os.getenv("OPENAI_RPM", "500")), int(os.getenv("OPENAI_TPM", "200000"))),
+    "gemini": (int(os.getenv("GEMINI_RPM", "1000")), int(os.getenv("GEMINI_TPM", "1000000"))),
+    "deepseek": (int(os.getenv("DEEPSEEK_RPM", "0")), int(os.getenv("DEEPSEEK_TPM", "0"))),
+}
+
+# 429 응답 시 같은 제공자로 재시도하는 최대 횟수
+MAX_RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+
+
+def rate_limit_retry_after(error: Exception) -> Optional[float]:
+    """429(요청 한도 초과) 오류이면 대기할 시간(초)을 반환하고, 아니면 None을 반환합니다."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status != 429:
+        return None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return 0.0
+
+
+class TokenBucket:
+    """분당 한도를 초 단위로 채워지는 토큰 버킷으로 적용합니다."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """토큰이 충분해질 때까지 기다린 후 차감합니다."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ProviderLimiter:
+    """제공자 하나의 RPM/TPM 제한과 AIMD 방식의 적응형 동시 요청 한도를 관리합니다.
+
+    성공할 때마다 한도를 조금씩 올리고(가산 증가), 429를 받으면 절반으로 줄이며(승산 감소)
+    retry-after 동안 새 요청을 멈춥니다.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, rpm: int = 0, tpm: int = 0,
+                 min_concurrency: int = 1):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.rate_limited = 0
+        self.request_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.token_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self._condition = threading.Condition()
+
+    def _acquire(self, tokens: int):
+        with self._condition:
+            while True:
+                wait = self.cooldown_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    break
+                self._condition.wait(timeout=wait if wait > 0 else None)
+        if self.request_bucket:
+            self.request_bucket.acquire(1)
+        if self.token_bucket:
+            self.token_bucket.acquire(tokens)
+
+    def _release(self, succeeded: bool, retry_after: Optional[float] = None):
+        with self._condition:
+            self.in_flight -= 1
+            if succeeded:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            elif retry_after is not None:
+                self.rate_limited += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + retry_after)
+            self._condition.notify_all()
+
+    def run(self, call: Callable, tokens: int = 1):
+        """제한을 지키며 call을 실행합니다. 429이면 대기 후 재시도하고, 한도를 넘으면 오류를 다시 발생시킵니다."""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self._acquire(tokens)
+            try:
+                result = call()
+            except Exception as e:
+                retry_after = rate_limit_retry_after(e)
+                if retry_after is None:
+                    self._release(succeeded=False)
+                    raise
+                # retry-after가 없으면 지수 백오프
+                retry_after = retry_after or float(2 ** attempt)
+                self._release(succeeded=False, retry_after=retry_after)
+                record_event(RATE_LIMIT_RETRY, self.name)
+                logger.warning(
+                    f"{self.name} 요청 한도 초과(429) - {retry_after:.1f}초 대기, "
+                    f"동시 요청 한도 {self.limit:.1f}로 조정 (재시도 {attempt + 1}/{MAX_RATE_LIMIT_RETRIES})"
+                )
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                continue
+            self._release(succeeded=True)
+            return result
+
+    def summary(self):
+        return {"concurrency_limit": round(self.limit, 2), "rate_limited": self.rate_limited}
@@ -0,0 +1,121 @@
+"""개정판 문서를 이전 번역과 비교하여 바뀐 세그먼트만 번역합니다.
+
+이전 번역은 두 가지 방법으로 가져올 수 있습니다.
+- 이전 원문 .docx와 그 번역 결과 .docx (같은 위치의 셀/단락끼리 짝지음)
+- 번역할 때 함께 저장한 세그먼트 매니페스트 (.manifest.json)
+
+어느 쪽이든 정규화한 원문 텍스트를 키로 비교하므로, 단락 순서가 바뀌거나 일부가 삭제되어도
+내용이 같은 세그먼트는 이전 번역(검토자가 수정한 번역 포함)을 그대로 사용합니다.
+"""
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from docx.document import Document
+
+from inline_format import encode_paragraph, has_tags
+from progress import ProgressReporter
+from segment_classifier import TRANSLATE, classify
+from segment_plan import SegmentPlan, iter_text_containers
+from translation_memory import normalize_text
+from translator import DocumentTranslator, load_document
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def pair_previous_translations(previous_source, previous_translated) -> Dict[str, str]:
+    """이전 원문과 번역 결과 문서에서 {정규화된 원문: 번역문}을 만듭니다.
+
+    번역은 문서 구조를 바꾸지 않으므로 같은 위치의 단락끼리 짝을 짓습니다.
+    """
+    source_doc = load_document(previous_source)
+    translated_doc = load_document(previous_translated)
+    sources = list(iter_text_containers(source_doc))
+    translations = list(iter_text_containers(translated_doc))
+    if len(sources) != len(translations):
+        raise ValueError(
+            f"이전 원문과 번역 결과의 문서 구조가 다릅니다. (원문: {len(sources)}, 번역: {len(translations)})"
+        )
+
+    previous = {}
+    for (_, source), (_, translated) in zip(sources, translations):
+        source_text = encode_paragraph(source)
+        translated_text = encode_paragraph(translated)
+        # 번역되지 않은 채 남은 세그먼트는 재사용하지 않음
+        if not source_text.strip() or translated_text == source_text:
+            continue
+        # 번역 대상이 아니거나 보호 구간을 가려서 번역하는 세그먼트는 계획의 텍스트와 달라지므로 다시 번역
+        classification = classify(source_text)
+        if classification.label != TRANSLATE or classification.protected:
+            continue
+        # 서식 구간이 여러 개인 단락은 번역문의 구간과 원문 태그를 짝지을 수 없으므로 다시 번역
+        if has_tags(source_text) or has_tags(translated_text):
+            continue
+        previous.setdefault(normalize_text(source_text), translated_text)
+    return previous
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    """세그먼트 매니페스트를 읽어 {정규화된 원문: 번역문}을 반환합니다. 파일이 없으면 빈 사전을 반환합니다."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.warning(f"지원하지 않는 매니페스트 버전이므로 무시합니다: {path}")
+        return {}
+    return manifest["segments"]
+
+
+def save_manifest(path: str, target_lang: str, segments: Dict[str, str]):
+    """{정규화된 원문: 번역문}을 세그먼트 매니페스트로 저장합니다."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "target_lang": target_lang, "segments": segments}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=1)
+
+
+def diff_plan(plan: SegmentPlan, previous: Dict[str, str], label: str = "") -> Dict[int, str]:
+    """이전 번역에 있는 그룹은 {그룹 번호: 번역문}으로 돌려주고, 나머지(추가/변경)는 번역 대상으로 남깁니다."""
+    if not previous:
+        return {}
+    done = {group.index: previous[group.key] for group in plan.groups if group.key in previous}
+    current_keys = {group.key for group in plan.groups}
+    removed = sum(1 for key in previous if key not in current_keys)
+    logger.info(
+        f"{label}개정 비교 - 변경 없음: {len(done)}, 추가/변경: {len(plan.groups) - len(done)}, 삭제: {removed}"
+    )
+    return done
+
+
+def translate_revision(translator: DocumentTranslator, source, target_langs: List[str],
+                       previous: Dict[str, Dict[str, str]],
+                       progress_factory: Optional[Callable[[str], ProgressReporter]] = None
+                       ) -> Tuple[Dict[str, Document], Dict[str, Dict[str, str]]]:
+    """개정판 문서에서 추가되거나 바뀐 세그먼트만 번역합니다.
+
+    previous는 언어별 {정규화된 원문: 번역문}입니다. 번역된 문서와 함께 다음 개정에 사용할
+    언어별 매니페스트 내용({정규화된 원문: 번역문})을 반환합니다.
+    """
+    doc = load_document(source)
+    plan = translator.plan_document(doc)
+    done = {lang: diff_plan(plan, previous.get(lang, {}), f"[{lang}] ") for lang in target_langs}
+
+    # 새로 번역한 그룹은 언어별 작업 스레드에서 각자의 사전에 모음
+    translated = {lang: dict(done[lang]) for lang in target_langs}
+
+    def collect(lang: str, group, text: str):
+        translated[lang][group.index] = text
+
+    documents = translator.translate_document_multi(
+        doc, target_langs, progress_factory=progress_factory, plan=plan, done=done, on_group_translated=collect
+    )
+    groups = plan.groups
+    manifests = {
+        lang: {groups[index].key: text for index, text in translated[lang].items()}
+        for lang in target_langs
+    }
+    return documents, manifests
@@ -0,0 +1,193 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from batching import estimate_tokens
+from metrics import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+# 라우터 기본 설정 (환경 변수로 조정 가능)
+# 목표: static(기존 고정 순서), fastest(처리 속도), cheapest(비용), balanced(속도와 비용 절충)
+DEFAULT_OBJECTIVE = os.getenv("ROUTER_OBJECTIVE", "balanced")
+DEFAULT_STATS_PATH = os.getenv("ROUTER_STATS_PATH", os.path.join("data", "router_stats.sqlite3"))
+# 통계를 믿고 순서를 바꾸기 전에 필요한 성공 호출 수
+ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+# 가끔 다른 제공자를 1순위로 시도하여 통계를 모으고 갱신하는 비율
+ROUTER_EXPLORE_RATE = float(os.getenv("ROUTER_EXPLORE_RATE", "0.05"))
+# 최근 호출에 두는 가중치 (지수 이동 평균)
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+# 통계를 디스크에 쓰는 최소 간격(초)
+ROUTER_FLUSH_INTERVAL = 10.0
+
+OBJECTIVES = ("static", "fastest", "cheapest", "balanced")
+
+
+class ProviderStats:
+    """(제공자, 대상 언어) 하나의 최근 성능. 비율과 속도는 지수 이동 평균입니다."""
+
+    def __init__(self, samples: int = 0, latency: float = 0.0, tokens_per_sec: float = 0.0,
+                 cost_per_1k: float = 0.0, failure_rate: float = 0.0, refusal_rate: float = 0.0):
+        self.samples = samples
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.cost_per_1k = cost_per_1k
+        self.failure_rate = failure_rate
+        self.refusal_rate = refusal_rate
+
+    def _average(self, current: float, value: float) -> float:
+        return value if self.samples == 0 else current + ROUTER_EWMA_ALPHA * (value - current)
+
+    def record(self, ok: bool, refused: bool, latency: float, tokens_per_sec: float, cost_per_1k: float):
+        self.failure_rate += ROUTER_EWMA_ALPHA * ((0.0 if ok else 1.0) - self.failure_rate)
+        if not ok:
+            return
+        self.refusal_rate += ROUTER_EWMA_ALPHA * ((1.0 if refused else 0.0) - self.refusal_rate)
+        self.latency = self._average(self.latency, latency)
+        self.tokens_per_sec = self._average(self.tokens_per_sec, tokens_per_sec)
+        self.cost_per_1k = self._average(self.cost_per_1k, cost_per_1k)
+        self.samples += 1
+
+    @property
+    def success_rate(self) -> float:
+        """쓸 수 있는 번역을 돌려줄 확률. 점수를 나눌 때 0이 되지 않도록 하한을 둡니다."""
+        return max(0.05, (1 - self.failure_rate) * (1 - self.refusal_rate))
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "samples": self.samples,
+            "latency": round(self.latency, 3),
+            "tokens_per_sec": round(self.tokens_per_sec, 1),
+            "cost_per_1k": round(self.cost_per_1k, 6),
+            "failure_rate": round(self.failure_rate, 3),
+            "refusal_rate": round(self.refusal_rate, 3),
+        }
+
+
+class ProviderRouter:
+    """(제공자, 대상 언어)별 통계로 호출 순서를 정합니다. 통계는 SQLite에 저장하여 재시작 후에도 유지합니다.
+
+    통계가 부족한 제공자는 기본 순서대로 뒤에 두며, ROUTER_EXPLORE_RATE 비율로 다른 제공자를 1순위로 올려
+    통계를 모으거나 갱신합니다.
+    """
+
+    def __init__(self, objective: Optional[str] = None, db_path: Optional[str] = None, seed: Optional[int] = None):
+        self.objective = objective or DEFAULT_OBJECTIVE
+        if self.objective not in OBJECTIVES:
+            raise ValueError(f"알 수 없는 라우팅 목표입니다: {self.objective} (사용 가능: {', '.join(OBJECTIVES)})")
+        self.db_path = db_path or DEFAULT_STATS_PATH
+        self.stats: Dict[tuple, ProviderStats] = {}
+        self._dirty = set()
+        self._flushed_at = time.monotonic()
+        # 탐색 대상을 고르는 난수 (벤치마크처럼 결과를 재현해야 하면 seed를 지정)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS provider_stats (
+                provider TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                samples INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                tokens_per_sec REAL NOT NULL,
+                cost_per_1k REAL NOT NULL,
+                failure_rate REAL NOT NULL,
+                refusal_rate REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (provider, target_lang)
+            )"""
+        )
+        self._conn.commit()
+        for provider, target_lang, *values in self._conn.execute(
+            "SELECT provider, target_lang, samples, latency, tokens_per_sec, cost_per_1k, failure_rate, refusal_rate "
+            "FROM provider_stats"
+        ):
+            self.stats[(provider, target_lang)] = ProviderStats(*values)
+        logger.info(f"라우터 초기화 완료 - 목표: {self.objective}, 저장된 통계 {len(self.stats)}건")
+
+    def record(self, provider: str, target_lang: str, ok: bool, latency: float, text: str,
+               result: Optional[str]):
+        """제공자 호출 한 번을 기록합니다. 토큰 수와 비용은 원문과 번역문 길이로 추정합니다."""
+        refused = ok and result == "번역 불가"
+        input_tokens = estimate_tokens(text, provider)
+        output_tokens = estimate_tokens(result, provider) if ok else 0
+        tokens_per_sec = output_tokens / latency if latency > 0 else 0.0
+        cost_per_1k = estimate_cost(provider, input_tokens, output_tokens) * 1000 / input_tokens
+        with self._lock:
+            stats = self.stats.setdefault((provider, target_lang), ProviderStats())
+            stats.record(ok, refused, latency, tokens_per_sec, cost_per_1k)
+            self._dirty.add((provider, target_lang))
+            if time.monotonic() - self._flushed_at >= ROUTER_FLUSH_INTERVAL:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        """바뀐 통계를 저장합니다. (잠금 상태에서 호출)"""
+        self._flushed_at = time.monotonic()
+        if not self._dirty:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO provider_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (provider, target_lang, stats.samples, stats.latency, stats.tokens_per_sec, stats.cost_per_1k,
+                 stats.failure_rate, stats.refusal_rate, time.time())
+                for (provider, target_lang), stats in ((key, self.stats[key]) for key in self._dirty)
+            ]
+        )
+        self._conn.commit()
+        self._dirty.clear()
+
+    def _scores(self, known: List[str], target_lang: str) -> Dict[str, float]:
+        """목표에 따른 점수 (낮을수록 우선). 속도와 비용은 후보 중 가장 좋은 값에 대한 비율로 맞춥니다."""
+        stats = {name: self.stats[(name, target_lang)] for name in known}
+        best_speed = max((s.tokens_per_sec for s in stats.values()), default=0.0) or 1.0
+        best_cost = min((s.cost_per_1k for s in stats.values() if s.cost_per_1k > 0), default=1.0)
+        scores = {}
+        for name, s in stats.items():
+            slowness = best_speed / s.tokens_per_sec if s.tokens_per_sec > 0 else float("inf")
+            price = s.cost_per_1k / best_cost
+            if self.objective == "fastest":
+                score = slowness
+            elif self.objective == "cheapest":
+                score = price
+            else:
+                score = (slowness + price) / 2
+            scores[name] = score / s.success_rate
+        return scores
+
+    def order(self, target_lang: str, preferred_order: List[str]) -> List[str]:
+        """기본 순서(preferred_order)를 목표에 맞게 다시 정렬한 호출 순서를 반환합니다."""
+        if self.objective == "static":
+            return list(preferred_order)
+        with self._lock:
+            known = [
+                name for name in preferred_order
+                if self.stats.get((name, target_lang), ProviderStats()).samples >= ROUTER_MIN_SAMPLES
+            ]
+            unknown = [name for name in preferred_order if name not in known]
+            # 기록이 적은 제공자를 우선 시도하고, 모두 충분하면 오래된 통계를 갱신하도록 아무 제공자나 시도
+            if preferred_order and self._random.random() < ROUTER_EXPLORE_RATE:
+                explore = self._random.choice(unknown or known)
+                return [explore] + [name for name in preferred_order if name != explore]
+            scores = self._scores(known, target_lang)
+        return sorted(known, key=lambda name: scores[name]) + unknown
+
+    def summary(self, target_lang: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                f"{provider}/{lang}": stats.summary()
+                for (provider, lang), stats in self.stats.items()
+                if target_lang is None or lang == target_lang
+            }
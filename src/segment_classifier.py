@@ -0,0 +1,102 @@
+"""번역 요청 전에 세그먼트를 분류하여 LLM에 보낼 필요가 없는 내용을 걸러냅니다.
+
+세그먼트마다 미리 컴파일한 정규식 몇 개로 한 번씩만 훑어 다음 중 하나로 분류합니다.
+- skip: 빈 텍스트, 기호만 있는 텍스트, 숫자/금액/날짜처럼 숫자만 있는 텍스트
+- pass_through: 내용은 있지만 번역할 한국어가 없는 텍스트 (URL, 이메일, 부품 번호, 코드,
+  이미 다른 언어로 된 텍스트, 한국어가 짧은 문자열/주석 안에만 있는 코드)
+- translate: 번역할 한국어가 있는 텍스트. 그 안의 URL, 이메일, 인라인 코드, 부품 번호는
+  <n/> 자리 표시자로 가려서 보내고, 번역 후 원래 값으로 되돌립니다.
+
+자리 표시자는 서식 태그와 같은 형식이므로 프롬프트 규칙과 배치 응답의 태그 검증이 그대로 적용됩니다.
+"""
+import re
+from typing import List, Tuple
+
+from batching import estimate_tokens
+from inline_format import TAG_PATTERN, strip_tags
+
+SKIP = "skip"
+PASS_THROUGH = "pass_through"
+TRANSLATE = "translate"
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+# 글자나 숫자가 하나도 없는 텍스트
+NO_CONTENT_PATTERN = re.compile(r"^[\W_]*$")
+# 숫자, 금액, 날짜, 백분율처럼 숫자와 기호만 있는 텍스트
+NUMERIC_PATTERN = re.compile(r"^[\s\d.,:;/%+\-–—~()\[\]#*₩$€¥£]*$")
+# 가려서 보낼 구간: URL, 이메일, 인라인 코드(`...`), 부품/모델 번호 (AB-1234, X200-B 등)
+PROTECTED_PATTERN = re.compile(
+    r"(?:https?|ftp)://[^\s<>\"]*[^\s<>\".,;:!?)\]}'’”]"
+    r"|www\.[^\s<>\"]*[^\s<>\".,;:!?)\]}'’”]"
+    r"|[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+"
+    r"|`[^`<>\n]+`"
+    r"|(?<![A-Za-z0-9])[A-Z]{1,6}-?\d{2,}(?:-[A-Z0-9]+)*(?![A-Za-z0-9])"
+)
+# 코드로 보이는 표시 (문장 끝 ;/{/}, 비교/화살표 연산자, 함수 호출, 키워드로 시작하는 줄)
+CODE_MARKER_PATTERN = re.compile(
+    r"[;{}]\s*$|==|!=|=>|->|::|\w\(.*\)"
+    r"|^\s*(?:def|class|import|from|return|const|let|var|function|public|private|SELECT|INSERT|UPDATE|DELETE)\b",
+    re.MULTILINE
+)
+# 코드 안의 문자열 리터럴과 주석. #와 --는 문서 본문에서도 흔히 쓰이므로 주석으로 보지 않음
+CODE_LITERAL_PATTERN = re.compile(r"\"[^\"\n]*\"|'[^'\n]*'|/\*.*?\*/|//.*$", re.MULTILINE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class Classification:
+    """세그먼트 하나의 분류 결과. text는 번역 요청에 보낼(가린) 텍스트입니다."""
+
+    def __init__(self, label: str, text: str, protected: List[Tuple[int, str]] = None, saved_tokens: int = 0):
+        self.label = label
+        self.text = text
+        # (자리 표시자 번호, 원래 값)
+        self.protected = protected or []
+        # 요청에서 줄어든 토큰 수 추정치
+        self.saved_tokens = saved_tokens
+
+
+def _is_code(plain_text: str) -> bool:
+    """코드처럼 보이고, 한국어가 문자열이나 주석 안에만 있으며 그 밖의 코드가 대부분인지 확인합니다.
+
+    `"보증 기간";`처럼 따옴표로 감싼 표 셀은 리터럴을 빼면 거의 남지 않으므로 번역 대상으로 둡니다.
+    """
+    if not CODE_MARKER_PATTERN.search(plain_text):
+        return False
+    code = CODE_LITERAL_PATTERN.sub("", plain_text)
+    if HANGUL_PATTERN.search(code):
+        return False
+    return 2 * len(WHITESPACE_PATTERN.sub("", code)) > len(WHITESPACE_PATTERN.sub("", plain_text))
+
+
+def classify(text: str) -> Classification:
+    """태그가 포함된 세그먼트 텍스트를 분류하고, 번역할 세그먼트는 보호 구간을 가립니다."""
+    plain_text = strip_tags(text)
+    if NO_CONTENT_PATTERN.match(plain_text) or NUMERIC_PATTERN.match(plain_text):
+        return Classification(SKIP, text)
+    if not HANGUL_PATTERN.search(PROTECTED_PATTERN.sub(" ", plain_text)) or _is_code(plain_text):
+        return Classification(PASS_THROUGH, text, saved_tokens=estimate_tokens(plain_text))
+
+    # 기존 서식 태그와 겹치지 않도록 그 다음 번호부터 자리 표시자를 붙임
+    tag_ids = [int(tag_id) for tag_id in re.findall(r"\d+", "".join(TAG_PATTERN.findall(text)))]
+    next_id = max(tag_ids, default=0) + 1
+    protected = []
+
+    def mask(match):
+        protected.append((next_id + len(protected), match.group()))
+        return f"<{protected[-1][0]}/>"
+
+    masked = PROTECTED_PATTERN.sub(mask, text)
+    return Classification(TRANSLATE, masked, protected, max(0, estimate_tokens(text) - estimate_tokens(masked)))
+
+
+def restore(translated_text: str, protected: List[Tuple[int, str]]) -> str:
+    """번역문의 자리 표시자를 원래 값으로 되돌립니다. 빠진 자리 표시자의 값은 끝에 붙입니다."""
+    missing = []
+    for tag_id, value in protected:
+        placeholder = f"<{tag_id}/>"
+        if placeholder in translated_text:
+            translated_text = translated_text.replace(placeholder, value, 1)
+        else:
+            missing.append(value)
+    return " ".join([translated_text] + missing) if missing else translated_text
+
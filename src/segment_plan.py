@@ -0,0 +1,173 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.part import PartFactory, XmlPart
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from inline_format import encode_paragraph, strip_tags
+from segment_classifier import PASS_THROUGH, SKIP, TRANSLATE, classify, restore
+from translation_memory import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# 본문 외에 번역하는 파트 (관계 유형 → 세그먼트 종류)
+STORY_RELTYPES = {
+    RT.HEADER: "header",
+    RT.FOOTER: "footer",
+    RT.FOOTNOTES: "footnote",
+    RT.ENDNOTES: "endnote",
+}
+
+# python-docx는 각주/미주 파트를 XML로 읽지 않으므로 XmlPart로 읽도록 등록
+for _content_type in (CT.WML_FOOTNOTES, CT.WML_ENDNOTES):
+    PartFactory.part_type_for.setdefault(_content_type, XmlPart)
+
+
+class Segment:
+    """문서 안의 번역 대상 단락 하나 (본문, 표 셀, 텍스트 상자, 머리글/바닥글, 각주/미주)."""
+
+    def __init__(self, index: int, kind: str, target: Any, text: str, protected: List[Tuple[int, str]] = None):
+        self.index = index
+        self.kind = kind
+        self.target = target
+        self.text = text
+        # 자리 표시자로 가린 보호 구간 (URL, 코드 등)
+        self.protected = protected or []
+
+    def restore(self, translated_text: str) -> str:
+        """그룹 번역문에 이 세그먼트의 보호 구간을 되돌립니다. (같은 그룹이라도 가린 값은 다를 수 있음)"""
+        return restore(translated_text, self.protected) if self.protected else translated_text
+
+
+class SegmentGroup:
+    """정규화 후 동일한 텍스트를 가진 세그먼트 묶음. 한 번만 번역합니다."""
+
+    def __init__(self, index: int, key: str, kind: str, text: str):
+        self.index = index
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.segments: List[Segment] = []
+        # 토큰 예산에 맞춰 나눈 원문 조각 (배치 구성 시 채워짐)
+        self.pieces: List[str] = [text]
+        # 조각마다 원문에서 뒤에 오던 구분자 (번역 후 줄바꿈을 되살릴 때 사용)
+        self.separators: List[str] = [""]
+
+
+class SegmentPlan:
+    """문서 전체의 세그먼트와 중복 제거된 번역 단위를 담습니다."""
+
+    def __init__(self):
+        self.segments: List[Segment] = []
+        self._groups = OrderedDict()
+        # 후보 단락마다 계획에 포함했는지 여부 (복제 문서에서 대상을 찾을 때 사용)
+        self.included: List[bool] = []
+        # 분류기가 걸러낸 세그먼트와 줄인 토큰 수
+        self.classification = {"skipped_segments": 0, "pass_through_segments": 0, "masked_spans": 0, "saved_tokens": 0}
+        # 요청 단위 배치: [((그룹 번호, 조각 번호), 텍스트), ...]의 목록 (배치 구성 시 채워짐)
+        self.batches: List[List[Tuple[Tuple[int, int], str]]] = []
+
+    def add(self, kind: str, target: Any, text: str):
+        """후보 단락을 분류하여 번역이 필요한 경우에만 계획에 추가합니다."""
+        classification = classify(text)
+        self.included.append(classification.label == TRANSLATE)
+        self.classification["saved_tokens"] += classification.saved_tokens
+        if classification.label == SKIP:
+            self.classification["skipped_segments"] += 1
+            return
+        if classification.label == PASS_THROUGH:
+            self.classification["pass_through_segments"] += 1
+            return
+        self.classification["masked_spans"] += len(classification.protected)
+        text = classification.text
+        segment = Segment(len(self.segments), kind, target, text, classification.protected)
+        self.segments.append(segment)
+        key = normalize_text(text)
+        group = self._groups.get(key)
+        if group is None:
+            # 그룹의 종류와 대표 텍스트는 처음 등장한 세그먼트를 따름
+            group = SegmentGroup(len(self._groups), key, kind, text)
+            self._groups[key] = group
+        group.segments.append(segment)
+
+    def resolve_targets(self, doc) -> List[Any]:
+        """같은 원본에서 복제한 문서에서 plan.segments와 순서가 일치하는 대상 목록을 찾습니다."""
+        candidates = [target for _, target, _ in iter_segments(doc)]
+        if len(candidates) != len(self.included):
+            raise ValueError(f"문서 구조가 번역 계획과 다릅니다. (계획: {len(self.included)}, 문서: {len(candidates)})")
+        return [target for target, included in zip(candidates, self.included) if included]
+
+    @property
+    def groups(self) -> List[SegmentGroup]:
+        """첫 등장 순서(문서 순서)대로 정렬된 그룹 목록."""
+        return list(self._groups.values())
+
+    @property
+    def dedup_ratio(self) -> float:
+        """중복 제거로 줄어든 세그먼트 비율."""
+        if not self.segments:
+            return 0.0
+        return 1 - len(self._groups) / len(self.segments)
+
+
+def _story_roots(doc) -> Iterator[Tuple[str, Any]]:
+    """번역할 이야기(story)의 루트 요소: 본문, 머리글/바닥글, 각주/미주. 파트마다 한 번씩 반환합니다."""
+    yield "paragraph", doc.element.body
+    seen_parts = set()
+    for rel in doc.part.rels.values():
+        if rel.is_external or rel.reltype not in STORY_RELTYPES or rel.target_part in seen_parts:
+            continue
+        seen_parts.add(rel.target_part)
+        yield STORY_RELTYPES[rel.reltype], rel.target_part.element
+
+
+def _paragraph_kind(p, story_kind: str) -> str:
+    parent = p.getparent()
+    if parent.tag == qn("w:txbxContent"):
+        return "textbox"
+    if parent.tag == qn("w:tc"):
+        return "cell"
+    return story_kind
+
+
+def iter_text_containers(doc) -> Iterator[Tuple[str, Any]]:
+    """문서의 모든 단락을 XML 순서대로 한 번씩 반환합니다. 번역 전후 문서에서 위치가 일치합니다.
+
+    중첩 표, 텍스트 상자, 머리글/바닥글, 각주/미주까지 포함하며, 병합된 셀처럼 python-docx가
+    여러 번 돌려주는 요소도 XML 요소 단위로 순회하므로 한 번만 나타납니다.
+    """
+    for story_kind, root in _story_roots(doc):
+        for p in root.iter(qn("w:p")):
+            yield _paragraph_kind(p, story_kind), Paragraph(p, doc.part)
+
+
+def iter_segments(doc) -> Iterator[Tuple[str, Any, str]]:
+    """표와 단락을 순회하며 텍스트가 있는 (종류, 대상, 텍스트)를 문서 순서대로 반환합니다.
+
+    텍스트는 글자 서식 구간을 태그로 표시한 번역 요청용 텍스트이며, 번역이 필요한지는 계획에서 분류합니다.
+    """
+    for kind, target in iter_text_containers(doc):
+        text = encode_paragraph(target)
+        if strip_tags(text).strip():
+            yield kind, target, text
+
+
+def build_segment_plan(doc) -> SegmentPlan:
+    """번역이 필요한 세그먼트를 분류하여 모으고 동일 텍스트를 묶습니다."""
+    return plan_from_segments(iter_segments(doc))
+
+
+def plan_from_segments(segments: Iterable[Tuple[str, Any, str]]) -> SegmentPlan:
+    """(종류, 대상, 텍스트)를 차례로 받아 번역 계획을 만듭니다. 문서 객체 없이 스트리밍으로 모을 때도 사용합니다."""
+    plan = SegmentPlan()
+    for kind, target, text in segments:
+        plan.add(kind, target, text)
+
+    logger.info(
+        f"세그먼트 계획 완료 - 전체: {len(plan.segments)}, 고유: {len(plan.groups)}, "
+        f"중복 제거율: {plan.dedup_ratio:.1%}, 분류기: {plan.classification}"
+    )
+    return plan
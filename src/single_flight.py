@@ -0,0 +1,59 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """진행 중인 번역 요청 하나. 같은 요청을 기다리는 호출자들이 결과를 공유합니다."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.result: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self._done = threading.Event()
+
+    def wait(self) -> Optional[str]:
+        """결과가 나올 때까지 기다립니다. 먼저 보낸 호출이 실패했으면 같은 오류를 발생시킵니다.
+
+        None은 먼저 보낸 쪽이 결과를 얻지 못했다는 뜻이므로, 기다린 쪽이 직접 번역해야 합니다.
+        """
+        self._done.wait()
+        if self.error is not None:
+            raise Exception(str(self.error))
+        return self.result
+
+
+class SingleFlight:
+    """프로세스 전체에서 같은 키의 번역 요청을 하나로 합칩니다.
+
+    키를 처음 요청한 호출자(리더)만 제공자를 호출하고, 그동안 같은 키로 들어온 호출자는
+    리더의 결과를 기다렸다가 그대로 사용합니다. 완료된 결과는 번역 메모리가 맡으므로 여기에는 남기지 않습니다.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Tuple[Flight, bool]:
+        """(진행 중인 요청, 리더 여부)를 반환합니다. 리더는 반드시 finish를 호출해야 합니다."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight(key)
+            return flight, True
+
+    def finish(self, flight: Flight, result: Optional[str] = None, error: Optional[Exception] = None):
+        """리더의 결과를 기다리던 호출자에게 전달하고 요청을 목록에서 지웁니다."""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        flight.result = result
+        flight.error = error
+        flight._done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
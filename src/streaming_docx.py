@@ -0,0 +1,194 @@
+"""python-docx 객체 모델 없이 word/document.xml을 스트리밍으로 읽고 쓰는 번역 경로입니다.
+
+수백 쪽짜리 문서도 메모리 사용량이 문서 크기와 무관하게 일정하도록,
+- 1차: iterparse로 단락을 하나씩 읽어 세그먼트를 만들고 바로 버리고,
+- 2차: 다시 iterparse로 읽으면서 번역문을 반영한 단락을 출력 파일에 곧바로 써 나갑니다.
+문서 전체에서 유지하는 것은 세그먼트 텍스트와 번역 결과뿐입니다.
+
+문서 본문(w:body)과 표 셀의 단락만 번역하며, 나머지 파트(스타일, 머리글 등)는 그대로 복사합니다.
+"""
+import logging
+import posixpath
+import zipfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from inline_format import apply_paragraph, encode_paragraph, strip_tags
+from progress import ProgressReporter
+from revision import diff_plan
+from segment_plan import plan_from_segments
+from translator import DocumentTranslator
+
+logger = logging.getLogger(__name__)
+
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+PACKAGE_RELS = "_rels/.rels"
+
+# 하위 요소를 하나씩 흘려보내는 컨테이너. 나머지 요소는 통째로 읽고 씁니다.
+# w:sdt, w:customXml은 본문이나 표 셀에 있을 때만 컨테이너이며, 단락 안에 있으면 단락의 일부입니다.
+CONTAINER_TAGS = {
+    qn("w:document"), qn("w:body"), qn("w:tbl"), qn("w:tr"), qn("w:tc"),
+    qn("w:sdt"), qn("w:sdtContent"), qn("w:customXml"),
+}
+PARAGRAPH_TAG = qn("w:p")
+
+
+def main_document_path(package: zipfile.ZipFile) -> str:
+    """패키지 관계에서 본문 파트 경로를 찾습니다. (보통 word/document.xml)"""
+    rels = etree.fromstring(package.read(PACKAGE_RELS))
+    for rel in rels:
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    raise ValueError("Word 문서의 본문 파트를 찾을 수 없습니다.")
+
+
+def _iterparse(source, events):
+    """python-docx의 요소 클래스를 사용하는 iterparse. (Run.text 등을 그대로 쓰기 위해)"""
+    context = etree.iterparse(source, events=events, remove_blank_text=True, resolve_entities=False)
+    context.set_element_class_lookup(element_class_lookup)
+    return context
+
+
+def _release(element):
+    """처리한 요소와 이미 지나간 형제 요소를 버려 메모리를 일정하게 유지합니다."""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def _is_streamed(element) -> bool:
+    """루트부터 element까지 모두 컨테이너인지 확인합니다. 단락 안의 컨테이너 태그는 흘려보내지 않습니다."""
+    while element is not None:
+        if element.tag not in CONTAINER_TAGS:
+            return False
+        element = element.getparent()
+    return True
+
+
+def _is_block_paragraph(element) -> bool:
+    parent = element.getparent()
+    return element.tag == PARAGRAPH_TAG and parent is not None and _is_streamed(parent)
+
+
+def _paragraph_kind(element) -> str:
+    return "cell" if element.getparent().tag == qn("w:tc") else "paragraph"
+
+
+def iter_streamed_segments(path: str) -> Iterator[Tuple[str, int, str]]:
+    """본문을 스트리밍으로 읽으며 텍스트가 있는 (종류, 단락 번호, 텍스트)를 문서 순서대로 반환합니다."""
+    with zipfile.ZipFile(path) as package:
+        with package.open(main_document_path(package)) as xml:
+            position = 0
+            for _, element in _iterparse(xml, ("end",)):
+                if element.getparent() is not None and not _is_streamed(element.getparent()):
+                    continue
+                if _is_block_paragraph(element):
+                    text = encode_paragraph(Paragraph(element, None))
+                    if strip_tags(text).strip():
+                        yield _paragraph_kind(element), position, text
+                    position += 1
+                if element.tag not in CONTAINER_TAGS:
+                    _release(element)
+
+
+def write_translated(path: str, output_path: str, replacements: Dict[int, str]):
+    """원본을 다시 스트리밍으로 읽으면서 {단락 번호: 번역문}을 반영한 문서를 저장합니다."""
+    with zipfile.ZipFile(path) as package, zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as output:
+        document_path = main_document_path(package)
+        for info in package.infolist():
+            if info.filename != document_path:
+                output.writestr(info, package.read(info.filename))
+                continue
+            with package.open(info) as xml, output.open(info.filename, "w") as target:
+                _rewrite_document(xml, target, replacements)
+
+
+def _namespace_declarations(element) -> List[bytes]:
+    """요소에서 유효한 네임스페이스 선언. 루트에서 이미 선언했으므로 하위 요소를 쓸 때는 지웁니다."""
+    return [
+        b' xmlns="%s"' % uri.encode() if prefix is None else b' xmlns:%s="%s"' % (prefix.encode(), uri.encode())
+        for prefix, uri in element.nsmap.items()
+    ]
+
+
+def _serialize(element, inherited: List[bytes]) -> bytes:
+    data = etree.tostring(element, encoding="UTF-8", xml_declaration=False)
+    head_end = data.index(b">")
+    head = data[:head_end]
+    for declaration in inherited:
+        head = head.replace(declaration, b"", 1)
+    return head + data[head_end:]
+
+
+def _start_tag(element, inherited: List[bytes]) -> bytes:
+    shell = etree.Element(element.tag, dict(element.attrib), nsmap=element.nsmap)
+    return _serialize(shell, inherited)[:-2] + b">"
+
+
+def _end_tag(element) -> bytes:
+    local_name = etree.QName(element).localname
+    return b"</%s>" % (f"{element.prefix}:{local_name}" if element.prefix else local_name).encode()
+
+
+def _rewrite_document(xml, target, replacements: Dict[int, str]):
+    target.write(b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n")
+    inherited: List[bytes] = []
+    position = 0
+    for event, element in _iterparse(xml, ("start", "end")):
+        parent = element.getparent()
+        # 컨테이너 안의 요소만 처리하고, 더 깊은 요소는 바깥 요소를 쓸 때 함께 씀
+        if parent is not None and not _is_streamed(parent):
+            continue
+        if element.tag in CONTAINER_TAGS:
+            if event == "start":
+                target.write(_start_tag(element, inherited))
+                if parent is None:
+                    inherited = _namespace_declarations(element)
+            else:
+                target.write(_end_tag(element))
+                _release(element)
+            continue
+        if event == "start":
+            continue
+        if _is_block_paragraph(element):
+            translated_text = replacements.get(position)
+            if translated_text is not None:
+                apply_paragraph(Paragraph(element, None), translated_text)
+            position += 1
+        target.write(_serialize(element, inherited))
+        _release(element)
+
+
+def translate_docx_streaming(translator: DocumentTranslator, path: str, target_langs: List[str],
+                             output_paths: Dict[str, str],
+                             previous: Optional[Dict[str, Dict[str, str]]] = None,
+                             progress_factory: Optional[Callable[[str], ProgressReporter]] = None
+                             ) -> Dict[str, Dict[str, str]]:
+    """대용량 문서를 스트리밍으로 번역하여 언어별 output_paths에 저장합니다.
+
+    previous는 revision 모듈과 같은 언어별 {정규화된 원문: 번역문}이며, 다음 개정에 사용할
+    언어별 매니페스트 내용을 반환합니다.
+    """
+    logger.info(f"스트리밍 문서 번역 시작 - 파일: {path}, 대상 언어: {target_langs}")
+    plan = translator.build_batches(plan_from_segments(iter_streamed_segments(path)))
+    done = {lang: diff_plan(plan, (previous or {}).get(lang, {}), f"[{lang}] ") for lang in target_langs}
+    translations = translator.translate_plan_multi(plan, target_langs, progress_factory, done)
+
+    groups = plan.groups
+    manifests = {}
+    for lang in target_langs:
+        # 세그먼트의 대상은 단락 번호이므로 번호별 번역문으로 펼쳐서 반영
+        replacements = {
+            segment.target: segment.restore(translations[lang][group.index])
+            for group in groups if group.index in translations[lang]
+            for segment in group.segments
+        }
+        write_translated(path, output_paths[lang], replacements)
+        manifests[lang] = {groups[index].key: text for index, text in translations[lang].items()}
+    return manifests
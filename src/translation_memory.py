@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# 번역 메모리 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_DB_PATH = os.getenv("TRANSLATION_MEMORY_PATH", os.path.join("data", "translation_memory.sqlite3"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+DEFAULT_LRU_SIZE = int(os.getenv("TRANSLATION_MEMORY_LRU_SIZE", "5000"))
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위해 텍스트를 정규화합니다. (유니코드 NFC, 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationMemory:
+    """SQLite 기반의 영구 번역 메모리입니다. 앞단에 프로세스 내 LRU 캐시를 둡니다."""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 lru_size: Optional[int] = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.max_entries = max_entries or DEFAULT_MAX_ENTRIES
+        self.lru_size = lru_size or DEFAULT_LRU_SIZE
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self.counters = {"lru_hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                target_lang TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used)")
+        self._conn.commit()
+        logger.info(f"번역 메모리 초기화 완료 - 경로: {self.db_path}, 최대 항목 수: {self.max_entries}")
+
+    @staticmethod
+    def make_key(text: str, target_lang: str, prompt_version: str, model: str) -> str:
+        """정규화된 원문, 대상 언어, 프롬프트 버전, 모델로 캐시 키를 만듭니다."""
+        raw = "\x1f".join([normalize_text(text), target_lang, prompt_version, model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, target_lang: str, prompt_version: str, model: str) -> Optional[str]:
+        """저장된 번역을 조회합니다. 없으면 None을 반환합니다."""
+        key = self.make_key(text, target_lang, prompt_version, model)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.counters["lru_hits"] += 1
+                return self._lru[key]
+
+            row = self._conn.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.counters["db_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, text: str, target_lang: str, prompt_version: str, model: str, translation: str):
+        """번역 결과를 저장합니다. 번역 거부("번역 불가")는 저장하지 않습니다."""
+        if not translation or translation.strip() == "번역 불가":
+            return
+        key = self.make_key(text, target_lang, prompt_version, model)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, target_lang, prompt_version, model, text, translation, time.time())
+            )
+            self._conn.commit()
+            self.counters["writes"] += 1
+            self._remember(key, translation)
+
+            # 크기 기반 정리는 쓰기 일정 횟수마다 한 번씩 수행
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= 500:
+                self._writes_since_eviction = 0
+                self._evict()
+
+    def _remember(self, key: str, translation: str):
+        """LRU 캐시에 항목을 추가합니다. (잠금 상태에서 호출)"""
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _evict(self):
+        """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다. (잠금 상태에서 호출)"""
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN "
+            "(SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+            (overflow,)
+        )
+        self._conn.commit()
+        self.counters["evictions"] += overflow
+        logger.info(f"번역 메모리 정리 - {overflow}개 항목 삭제")
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스 카운터와 적중률을 반환합니다."""
+        with self._lock:
+            stats = dict(self.counters)
+        hits = stats["lru_hits"] + stats["db_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
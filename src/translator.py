@@ -1,16 +1,34 @@
-from typing import Optional, Dict, Any
-from langchain_community.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from langchain_community.callbacks.manager import get_openai_callback
-import google.generativeai as genai
-from openai import OpenAI
+from typing import Optional, Dict, Any, Callable, List
+import httpx
+from openai import DefaultHttpxClient, OpenAI
 import os
 from dotenv import load_dotenv
 from docx import Document
-import streamlit as st
+from docx.document import Document as DocumentObject
 import logging
+import contextvars
+import threading
+import copy
+import io
+import queue
 import time
-from datetime import datetime, timedelta
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from translation_memory import TranslationMemory
+from segment_plan import SegmentGroup, SegmentPlan, build_segment_plan
+from inline_format import apply_paragraph
+from batching import DEFAULT_TOKEN_BUDGET, estimate_tokens, join_pieces, pack_batches, split_sentences
+from batch_protocol import encode_batch, parse_batch_response
+from prompts import PROMPT_STYLE, build_prompt, prompt_overhead
+from backends import Backend, load_backends
+from provider_health import ProviderRegistry
+from router import ProviderRouter
+from single_flight import SingleFlight
+from rate_limit import DEFAULT_RATE_LIMITS, ProviderLimiter
+from metrics import (BATCH_RETRY, CACHE_HIT, CACHE_MISS, COALESCED, FALLBACK, HEDGE, HEDGE_WIN, DocumentMetrics, record_call,
+                     record_event, record_prompt, record_stream, reset_current_document, set_price, set_current_document, start_metrics_server, usage_tokens)
+from progress import (ProgressReporter, QueuedProgressReporter, TokenProgress, drain_events, report_error,
+                      reset_current_reporter, set_current_reporter)
 
 # 로깅 설정
 logging.basicConfig(
@@ -22,8 +40,96 @@ logger = logging.getLogger(__name__)
 # 환경 변수 로드
 load_dotenv()
 
+# 동시 실행 기본값 (환경 변수로 조정 가능)
+DEFAULT_MAX_WORKERS = int(os.getenv("TRANSLATE_MAX_WORKERS", "8"))
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")),
+    "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+    "deepseek": int(os.getenv("DEEPSEEK_MAX_CONCURRENCY", "4")),
+}
+
+# 지원 언어 (UI 표시 이름)와 CLI용 언어 코드
+SUPPORTED_LANGUAGES = ["중국어 간체", "영어", "일본어", "베트남어", "태국어", "인도네시아어"]
+LANGUAGE_CODES = {
+    "zh": "중국어 간체",
+    "en": "영어",
+    "ja": "일본어",
+    "vi": "베트남어",
+    "th": "태국어",
+    "id": "인도네시아어",
+}
+
+# 번역 메모리 키에 포함되는 프롬프트 버전 (프롬프트를 바꾸면 함께 올려주세요)
+PROMPT_VERSION = "3"
+
+# 배치 응답에서 누락되거나 잘못된 세그먼트를 다시 요청하는 최대 횟수
+MAX_BATCH_RETRIES = 2
+
+# 제공자 호출 하나의 제한 시간(초). 응답 없이 멈춘 요청이 문서 번역 전체를 붙잡지 않도록 함
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "60"))
+
+# 번역 중 토큰 진행 상황과 남은 시간을 보고하는 간격(초)
+PROGRESS_INTERVAL = 1.0
+
+# HTTP 연결 풀 설정 (세션 간에 연결을 재사용하여 TLS 핸드셰이크 비용을 줄임)
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "32")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "16")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120")),
+)
+
+# 분할된 단락 조각을 다시 합칠 때 공백을 넣지 않는 언어
+NO_SPACE_LANGUAGES = {"중국어 간체", "일본어", "태국어"}
+
+
+class StreamedResponse:
+    """스트리밍 응답을 모두 읽은 결과. usage는 (입력, 출력) 토큰 수입니다."""
+
+    def __init__(self, text: str, usage):
+        self.text = text
+        self.usage = usage
+
+
+def read_stream(chunks, provider: str) -> StreamedResponse:
+    """OpenAI 호환 또는 Gemini 스트리밍 응답을 읽으면서 받은 출력 토큰 수를 바로 기록합니다.
+    
+    조각마다의 토큰 수는 추정치이며, 마지막에 제공자가 알려준 실제 출력 토큰 수와의 차이를 보정합니다.
+    """
+    parts = []
+    usage = (None, None)
+    streamed = 0
+    for chunk in chunks:
+        choices = getattr(chunk, "choices", None)
+        if choices is not None:
+            # OpenAI 호환: 마지막 조각은 choices 없이 usage만 담김
+            delta = choices[0].delta.content if choices else None
+        else:
+            try:
+                delta = chunk.text
+            except ValueError:
+                # Gemini: 텍스트 없이 종료 사유만 담긴 조각
+                delta = None
+        if delta:
+            parts.append(delta)
+            tokens = max(1, estimate_tokens(delta, provider) - 1)
+            streamed += tokens
+            record_stream(tokens)
+        chunk_usage = usage_tokens(chunk)
+        if chunk_usage != (None, None):
+            usage = chunk_usage
+    if usage[1] is not None:
+        record_stream(usage[1] - streamed)
+    return StreamedResponse("".join(parts), usage)
+
+
 class DocumentTranslator:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None,
+                 provider_concurrency: Optional[Dict[str, int]] = None,
+                 memory: Optional[TranslationMemory] = None,
+                 token_budget: Optional[int] = None,
+                 prompt_style: Optional[str] = None,
+                 router: Optional[ProviderRouter] = None,
+                 backends: Optional[List[Backend]] = None):
         logger.info("DocumentTranslator 초기화 시작")
         # API 키 설정
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -33,248 +139,679 @@ class DocumentTranslator:
         logger.info("API 키 로드 완료")
         
         # OpenAI 설정 (최신 공식 문서 기준)
-        self.openai_client = OpenAI()  # API 키는 환경 변수에서 자동으로 로드
+        # API 키는 환경 변수에서 자동으로 로드, 연결 풀은 프로세스 수명 동안 유지
+        # 429는 ProviderLimiter가, 그 밖의 실패는 제공자 대체와 헤지 요청이 처리하므로 SDK 자체 재시도는 끔
+        self.openai_client = OpenAI(
+            timeout=PROVIDER_TIMEOUT, max_retries=0,
+            http_client=DefaultHttpxClient(limits=HTTP_POOL_LIMITS)
+        )
         
         # Gemini 설정 (최신 공식 문서 기준)
+        # google.generativeai는 로드가 무거우므로 번역기를 처음 만들 때 가져옴
+        import google.generativeai as genai
         genai.configure(api_key=self.gemini_api_key)
         self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
         
         # DeepSeek 설정
         self.deepseek_client = OpenAI(
             api_key=self.deepseek_api_key,
-            base_url="https://api.deepseek.com/v1"
+            base_url="https://api.deepseek.com/v1",
+            timeout=PROVIDER_TIMEOUT, max_retries=0,
+            http_client=DefaultHttpxClient(limits=HTTP_POOL_LIMITS)
         )
         
         logger.info("API 클라이언트 초기화 완료")
         
-        # 번역 시스템 프롬프트
-        self.system_prompt = """당신은 전문 번역가입니다. 
-        다음 규칙을 엄격히 지켜주세요:
-        1. 주어진 한국어 텍스트를 정확하고 자연스럽게 번역해주세요.
-        2. 전문 용어나 문맥을 고려하여 번역해주세요.
-        3. 번역할 때는 원문의 의미와 뉘앙스를 최대한 살려주세요.
-        4. 번역 결과만 출력해주세요. 다른 설명이나 주석을 추가하지 마세요.
-        5. 번역이 불가능한 경우 "번역 불가"라고만 답변해주세요.
-        6. 번역할 때는 원문의 형식(줄바꿈, 들여쓰기, 표 형식 등)을 유지해주세요."""
+        # 제공자 등록 (상태 추적 및 서킷 브레이커)
+        self.providers = ProviderRegistry()
+        self.providers.register("openai", self.translate_with_openai)
+        self.providers.register("gemini", self.translate_with_gemini)
+        self.providers.register("deepseek", self.translate_with_deepseek)
+        
+        # 설정 파일(backends.json)로 추가한 OpenAI 호환 백엔드
+        if backends is None:
+            backends = load_backends(builtin_names=list(self.providers.providers))
+        self.backends = {backend.name: backend for backend in backends}
+        for backend in backends:
+            client = OpenAI(
+                api_key=backend.api_key, base_url=backend.base_url,
+                timeout=PROVIDER_TIMEOUT, max_retries=0,
+                http_client=DefaultHttpxClient(limits=HTTP_POOL_LIMITS)
+            )
+            self.providers.register(
+                backend.name,
+                lambda text, target_lang, json_mode=False, backend=backend, client=client:
+                    self.translate_with_backend(backend, client, text, target_lang, json_mode)
+            )
+            set_price(backend.name, backend.price_input, backend.price_output)
+        
+        # 제공자 호출 순서 (언어별 통계와 목표에 따라 정함)
+        self.router = router or ProviderRouter()
+        
+        # 동시 실행 설정: 전체 작업자 수와 제공자별 동시 요청 한도
+        # 제공자별 한도는 AIMD 제어의 상한이며, RPM/TPM 제한과 429 백오프를 함께 적용
+        self.max_workers = max(1, max_workers or DEFAULT_MAX_WORKERS)
+        limits = dict(DEFAULT_PROVIDER_CONCURRENCY)
+        limits.update(provider_concurrency or {})
+        self.limiters = {
+            name: ProviderLimiter(name, limit, *DEFAULT_RATE_LIMITS.get(name, (0, 0)))
+            for name, limit in limits.items()
+        }
+        for backend in backends:
+            self.limiters[backend.name] = ProviderLimiter(backend.name, backend.max_concurrency, backend.rpm, backend.tpm)
+        logger.info(f"동시 실행 설정 - 작업자 수: {self.max_workers}, 제공자별 한도: {limits}")
+        
+        # 제공자 호출 전용 스레드 (느린 호출을 기다리는 동안 헤지 요청을 보내기 위해 별도 스레드에서 호출)
+        # 언어별 작업자와 동시 실행 작업, 호출마다의 헤지 요청까지 담을 수 있도록 넉넉하게 잡되 필요할 때만 생성됨
+        self.call_executor = ThreadPoolExecutor(
+            max_workers=self.max_workers * len(SUPPORTED_LANGUAGES) * 4, thread_name_prefix="provider-call"
+        )
+        
+        # 번역 메모리 (제공자 호출 전에 조회)
+        self.memory = memory or TranslationMemory()
+        self.model_signature = "|".join(
+            ["gpt-4o-mini", "gemini-2.0-flash", "deepseek-chat"] + [backend.model for backend in backends]
+        )
+        
+        # 진행 중인 같은 요청 합치기 (공유 번역기이므로 모든 세션의 요청이 대상)
+        self.flights = SingleFlight()
+        
+        # 요청 하나에 담을 토큰 예산
+        self.token_budget = token_budget or DEFAULT_TOKEN_BUDGET
+        
+        # 프롬프트 형식 (full, compact, auto - prompts 모듈 참고)
+        self.prompt_style = prompt_style or PROMPT_STYLE
     
-    def translate_with_openai(self, text: str, target_lang: str) -> str:
+    def warm_up(self):
+        """백그라운드에서 OpenAI/DeepSeek 연결을 미리 열어 첫 요청의 TLS 핸드셰이크 지연을 없앱니다."""
+        def open_connections():
+            for name, client in (("openai", self.openai_client), ("deepseek", self.deepseek_client)):
+                try:
+                    client.models.list()
+                    logger.info(f"{name} 연결 준비 완료")
+                except Exception as e:
+                    logger.warning(f"{name} 연결 준비 실패: {str(e)}")
+        
+        threading.Thread(target=open_connections, name="translator-warm-up", daemon=True).start()
+    
+    def build_prompt(self, text: str, target_lang: str, json_mode: bool, provider: str):
+        """(시스템 프롬프트, 사용자 메시지)를 만들고 프롬프트 고정 부분과 본문의 토큰 수를 기록합니다."""
+        system, user = build_prompt(text, target_lang, json_mode, self.prompt_style)
+        record_prompt(provider, *prompt_overhead(system, user, text, json_mode, provider))
+        return system, user
+    
+    def translate_with_openai(self, text: str, target_lang: str, json_mode: bool = False) -> str:
         """OpenAI를 사용하여 텍스트를 번역합니다."""
+        start = time.time()
         try:
             logger.info(f"OpenAI API 호출 시작 - 텍스트 길이: {len(text)}")
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"다음 한국어 텍스트를 {target_lang}로 번역해주세요:\n\n{text}"}
-                ]
+            system, user = self.build_prompt(text, target_lang, json_mode, "openai")
+            response = self.limiters["openai"].run(
+                lambda: read_stream(self.openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user}
+                    ],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **({"response_format": {"type": "json_object"}} if json_mode else {})
+                ), "openai"),
+                tokens=2 * estimate_tokens(text, "openai")
             )
-            result = response.choices[0].message.content.strip()
+            record_call("openai", time.time() - start, *response.usage, ok=True)
+            result = response.text.strip()
             logger.info(f"OpenAI API 응답 완료 - 번역 결과 길이: {len(result)}")
             return result
         except Exception as e:
+            record_call("openai", time.time() - start, 0, 0, ok=False)
             logger.error(f"OpenAI API 호출 실패: {str(e)}")
-            st.error(f"OpenAI 번역 중 오류 발생: {str(e)}")
+            report_error(f"OpenAI 번역 중 오류 발생: {str(e)}")
             return None
     
-    def translate_with_gemini(self, text: str, target_lang: str) -> str:
+    def translate_with_gemini(self, text: str, target_lang: str, json_mode: bool = False) -> str:
         """Gemini를 사용하여 텍스트를 번역합니다."""
+        start = time.time()
         try:
             logger.info(f"Gemini API 호출 시작 - 텍스트 길이: {len(text)}")
-            response = self.gemini_model.generate_content(
-                f"{self.system_prompt}\n\n다음 한국어 텍스트를 {target_lang}로 번역해주세요:\n\n{text}"
+            system, user = self.build_prompt(text, target_lang, json_mode, "gemini")
+            response = self.limiters["gemini"].run(
+                lambda: read_stream(self.gemini_model.generate_content(
+                    f"{system}\n\n{user}",
+                    generation_config={"response_mime_type": "application/json"} if json_mode else None,
+                    request_options={"timeout": PROVIDER_TIMEOUT},
+                    stream=True
+                ), "gemini"),
+                tokens=2 * estimate_tokens(text, "gemini")
             )
+            record_call("gemini", time.time() - start, *response.usage, ok=True)
             result = response.text.strip()
             logger.info(f"Gemini API 응답 완료 - 번역 결과 길이: {len(result)}")
             return result
         except Exception as e:
+            record_call("gemini", time.time() - start, 0, 0, ok=False)
             logger.error(f"Gemini API 호출 실패: {str(e)}")
-            st.error(f"Gemini 번역 중 오류 발생: {str(e)}")
+            report_error(f"Gemini 번역 중 오류 발생: {str(e)}")
             return None
     
-    def translate_with_deepseek(self, text: str, target_lang: str) -> str:
+    def translate_with_deepseek(self, text: str, target_lang: str, json_mode: bool = False) -> str:
         """DeepSeek를 사용하여 텍스트를 번역합니다."""
+        start = time.time()
         try:
             logger.info(f"DeepSeek API 호출 시작 - 텍스트 길이: {len(text)}")
-            response = self.deepseek_client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"다음 한국어 텍스트를 {target_lang}로 번역해주세요:\n\n{text}"}
-                ],
-                temperature=0.7
+            system, user = self.build_prompt(text, target_lang, json_mode, "deepseek")
+            response = self.limiters["deepseek"].run(
+                lambda: read_stream(self.deepseek_client.chat.completions.create(
+                    model="deepseek-chat",
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user}
+                    ],
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **({"response_format": {"type": "json_object"}} if json_mode else {})
+                ), "deepseek"),
+                tokens=2 * estimate_tokens(text, "deepseek")
             )
-            result = response.choices[0].message.content.strip()
+            record_call("deepseek", time.time() - start, *response.usage, ok=True)
+            result = response.text.strip()
             logger.info(f"DeepSeek API 응답 완료 - 번역 결과 길이: {len(result)}")
             return result
         except Exception as e:
+            record_call("deepseek", time.time() - start, 0, 0, ok=False)
             logger.error(f"DeepSeek API 호출 실패: {str(e)}")
-            st.error(f"DeepSeek 번역 중 오류 발생: {str(e)}")
+            report_error(f"DeepSeek 번역 중 오류 발생: {str(e)}")
+            return None
+    
+    def translate_with_backend(self, backend: Backend, client: OpenAI, text: str, target_lang: str,
+                               json_mode: bool = False) -> str:
+        """설정 파일로 추가한 OpenAI 호환 백엔드를 사용하여 텍스트를 번역합니다."""
+        start = time.time()
+        try:
+            logger.info(f"{backend.name} API 호출 시작 - 텍스트 길이: {len(text)}")
+            system, user = self.build_prompt(text, target_lang, json_mode, backend.name)
+            response = self.limiters[backend.name].run(
+                lambda: read_stream(client.chat.completions.create(
+                    model=backend.model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user}
+                    ],
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **({"response_format": {"type": "json_object"}} if json_mode and backend.json_mode else {})
+                ), backend.name),
+                tokens=2 * estimate_tokens(text, backend.name)
+            )
+            record_call(backend.name, time.time() - start, *response.usage, ok=True)
+            result = response.text.strip()
+            logger.info(f"{backend.name} API 응답 완료 - 번역 결과 길이: {len(result)}")
+            return result
+        except Exception as e:
+            record_call(backend.name, time.time() - start, 0, 0, ok=False)
+            logger.error(f"{backend.name} API 호출 실패: {str(e)}")
+            report_error(f"{backend.name} 번역 중 오류 발생: {str(e)}")
             return None
     
     def translate_text(self, text: str, target_lang: str) -> str:
-        """Failover 메커니즘을 사용하여 텍스트를 번역합니다."""
+        """번역 메모리를 먼저 확인하고, 없으면 Failover 메커니즘으로 번역합니다.
+        
+        다른 세션이 같은 텍스트를 같은 언어로 번역 중이면 새로 요청하지 않고 그 결과를 기다리며,
+        그 요청이 실패하면 직접 다시 요청합니다.
+        """
         if not text.strip():
             logger.warning("빈 텍스트 입력됨")
             return ""
-            
-        logger.info(f"번역 시작 - 대상 언어: {target_lang}")
-            
-        # 중국어 번역의 경우 DeepSeek를 우선 사용
-        if target_lang == "중국어 간체":
-            logger.info("DeepSeek API로 중국어 번역 시도")
-            result = self.translate_with_deepseek(text, target_lang)
-            if result and result != "번역 불가":
-                logger.info("DeepSeek API 번역 성공")
+        
+        cached = self.memory.get(text, target_lang, PROMPT_VERSION, self.model_signature)
+        if cached is not None:
+            logger.info("번역 메모리 적중")
+            record_event(CACHE_HIT)
+            return cached
+        
+        record_event(CACHE_MISS)
+        while True:
+            flight, leader = self.flights.claim(self.memory_key(text, target_lang))
+            if leader:
+                break
+            logger.info("같은 번역 요청이 진행 중이므로 결과를 기다립니다.")
+            record_event(COALESCED)
+            try:
+                result = flight.wait()
+            except Exception as e:
+                # 먼저 보낸 요청이 실패하면 배치 경로와 마찬가지로 직접 요청 (다시 리더가 되어 시도)
+                logger.warning(f"공유된 번역 요청 실패, 직접 다시 요청합니다: {str(e)}")
+                continue
+            if result is not None:
                 return result
         
-        # 다른 언어의 경우 OpenAI를 우선 사용
-        logger.info("OpenAI API로 번역 시도")
-        result = self.translate_with_openai(text, target_lang)
-        if result and result != "번역 불가":
-            logger.info("OpenAI API 번역 성공")
-            return result
+        try:
+            # 메모리를 확인한 직후 다른 요청이 끝났을 수 있으므로 리더가 된 뒤 한 번 더 확인
+            result = self.memory.get(text, target_lang, PROMPT_VERSION, self.model_signature)
+            if result is None:
+                result = self._translate_with_failover(text, target_lang)
+                self.memory.put(text, target_lang, PROMPT_VERSION, self.model_signature, result)
+        except Exception as e:
+            self.flights.finish(flight, error=e)
+            raise
+        self.flights.finish(flight, result)
+        return result
+    
+    def memory_key(self, text: str, target_lang: str) -> str:
+        """번역 메모리와 같은 키 (정규화된 원문, 대상 언어, 프롬프트 버전, 모델)."""
+        return TranslationMemory.make_key(text, target_lang, PROMPT_VERSION, self.model_signature)
+    
+    def provider_order(self, target_lang: str) -> list:
+        """대상 언어별 기본 제공자 순서를 반환합니다. 라우터는 통계가 쌓이기 전까지 이 순서를 사용합니다."""
+        # 중국어 번역의 경우 DeepSeek를 우선 사용, 다른 언어는 OpenAI 우선
+        if target_lang == "중국어 간체":
+            order = ["deepseek", "openai", "gemini"]
+        else:
+            order = ["openai", "gemini", "deepseek"]
+        return order + [name for name, backend in self.backends.items() if backend.serves(target_lang)]
+    
+    def _call_provider(self, name: str, text: str, target_lang: str, json_mode: bool) -> Optional[str]:
+        """제공자를 호출하고 결과를 라우터 통계에 기록합니다."""
+        start = time.time()
+        result = self.providers.call(name, text, target_lang, json_mode)
+        self.router.record(name, target_lang, result is not None, time.time() - start, text, result)
+        return result
+    
+    def _translate_with_failover(self, text: str, target_lang: str, json_mode: bool = False) -> str:
+        """Failover 메커니즘을 사용하여 텍스트를 번역합니다. 차단된 제공자는 건너뜁니다.
         
-        # OpenAI 실패시 Gemini로 시도
-        logger.info("Gemini API로 번역 시도")
-        result = self.translate_with_gemini(text, target_lang)
-        if result and result != "번역 불가":
-            logger.info("Gemini API 번역 성공")
-            return result
+        호출 순서는 라우터가 (제공자, 대상 언어)별 통계와 목표(ROUTER_OBJECTIVE)로 정합니다.
         
-        # Gemini 실패시 DeepSeek로 시도
-        logger.info("DeepSeek API로 마지막 번역 시도")
-        result = self.translate_with_deepseek(text, target_lang)
-        if result and result != "번역 불가":
-            logger.info("DeepSeek API 번역 성공")
-            return result
+        마지막으로 보낸 요청이 제공자의 최근 지연 시간 백분위수(hedge_delay) 안에 응답하지 않으면
+        다음 제공자에 같은 요청을 보내고(헤지 요청), 먼저 도착한 정상 응답을 사용합니다.
+        늦은 쪽 응답은 버리며, 호출마다 PROVIDER_TIMEOUT이 있으므로 무한정 남지 않습니다.
+        """
+        logger.info(f"번역 시작 - 대상 언어: {target_lang}")
+        order = self.providers.route(self.router.order(target_lang, self.provider_order(target_lang)))
+        remaining = list(order)
+        pending = {}  # 진행 중인 호출 → (제공자, 보낸 이유)
+        launched = []
+        
+        def launch(reason: str) -> bool:
+            """남은 제공자 중 지금 호출할 수 있는 다음 제공자에 요청을 보냅니다. 보낼 곳이 없으면 False."""
+            while remaining:
+                name = remaining.pop(0)
+                # 반열림 제공자의 시험 요청 자리는 실제로 호출할 때만 차지 (모두 차단된 경우 마지막 후보는 그대로 시도)
+                if not self.providers.acquire(name) and (launched or remaining):
+                    logger.info(f"{name} 제공자는 시험 요청이 진행 중이므로 건너뜁니다.")
+                    continue
+                launched.append(name)
+                logger.info(f"{name} API로 번역 시도" + (" (헤지 요청)" if reason == HEDGE else ""))
+                # 오류 보고와 호출 지표가 현재 문서로 모이도록 컨텍스트를 복사하여 실행
+                future = self.call_executor.submit(
+                    contextvars.copy_context().run, self._call_provider, name, text, target_lang, json_mode
+                )
+                pending[future] = (name, reason)
+                return True
+            return False
+        
+        launch("primary")
+        while pending:
+            # 남은 제공자가 있으면 마지막 요청의 제공자 기준 시간까지만 기다리고, 넘기면 헤지 요청
+            delay = self.providers.hedge_delay(launched[-1]) if remaining else None
+            finished, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not finished:
+                if launch(HEDGE):
+                    logger.warning(f"응답이 {delay:.1f}초를 넘어 {launched[-1]}에 헤지 요청을 보냈습니다.")
+                    record_event(HEDGE, launched[-1])
+                continue
+            for future in finished:
+                name, reason = pending.pop(future)
+                result = future.result()
+                if result and result != "번역 불가":
+                    logger.info(f"{name} API 번역 성공")
+                    if reason == FALLBACK:
+                        record_event(FALLBACK, name)
+                    elif reason == HEDGE:
+                        record_event(HEDGE_WIN, name)
+                    return result
+                # 실패하면 헤지 요청과 별개로 바로 다음 제공자로 대체
+                launch(FALLBACK)
         
         logger.error("모든 번역 서비스 실패")
         raise Exception("모든 번역 서비스가 실패했습니다.")
     
-    def translate_document(self, doc_path: str, target_lang: str) -> Document:
-        """Word 문서를 번역합니다."""
-        start_time = time.time()
-        logger.info(f"문서 번역 시작 - 파일: {doc_path}, 대상 언어: {target_lang}")
-        doc = Document(doc_path)
-        
-        # 진행 상태 표시를 위한 프로그레스 바와 상태 텍스트
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        time_info = st.empty()
-        completion_info = st.empty()
-        
-        def update_time_info(progress: float, start_time: float, is_completed: bool = False):
-            """진행 시간과 예상 완료 시간을 업데이트합니다."""
-            elapsed_time = time.time() - start_time
-            if is_completed:
-                time_info.text(f"총 소요 시간: {timedelta(seconds=int(elapsed_time))}")
-                completion_info.success("번역이 완료되었습니다!")
-            elif progress > 0:
-                estimated_total_time = elapsed_time / progress
-                remaining_time = estimated_total_time - elapsed_time
-                estimated_completion = datetime.now() + timedelta(seconds=remaining_time)
-                
-                time_info.text(
-                    f"진행 시간: {timedelta(seconds=int(elapsed_time))} | "
-                    f"예상 남은 시간: {timedelta(seconds=int(remaining_time))} | "
-                    f"예상 완료 시간: {estimated_completion.strftime('%H:%M:%S')}"
-                )
+    def _batch_translate_segments(self, cells_data: list, target_lang: str) -> list:
+        """여러 세그먼트의 텍스트를 한 번에 번역합니다. 번역 메모리에 있는 세그먼트는 요청에서 제외합니다."""
+        if not cells_data:
+            return []
+        
+        results = [None] * len(cells_data)
+        pending = []
+        for idx, (_, text) in enumerate(cells_data):
+            cached = self.memory.get(text, target_lang, PROMPT_VERSION, self.model_signature)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                pending.append(idx)
+        record_event(CACHE_HIT, count=len(cells_data) - len(pending))
+        record_event(CACHE_MISS, count=len(pending))
+        
+        # 다른 요청이 이미 번역 중인 세그먼트는 이 배치에서 빼고 그 결과를 기다림
+        flights, waiting = {}, {}
+        for idx in pending:
+            flight, leader = self.flights.claim(self.memory_key(cells_data[idx][1], target_lang))
+            (flights if leader else waiting)[idx] = flight
+        record_event(COALESCED, count=len(waiting))
+        
+        try:
+            self._translate_claimed_segments(cells_data, target_lang, results, flights)
+        finally:
+            # 결과를 얻지 못한 세그먼트는 기다리던 쪽이 직접 번역하도록 None으로 끝냄
+            for flight in flights.values():
+                self.flights.finish(flight, None)
         
-        def is_translatable(text: str) -> bool:
-            """번역이 필요한 텍스트인지 확인합니다."""
-            # 숫자나 특수문자만 있는 경우 번역하지 않음
-            if text.strip().replace('.', '').replace(',', '').replace(' ', '').isdigit():
-                return False
-            # 한글이나 의미있는 문자가 포함된 경우에만 번역
-            return any(ord('가') <= ord(c) <= ord('힣') for c in text)
-        
-        def batch_translate_cells(cells_data: list) -> list:
-            """여러 셀의 텍스트를 한 번에 번역합니다."""
-            if not cells_data:
-                return []
-                
+        # 남은 세그먼트와 결과를 얻지 못한 공유 세그먼트는 개별 요청으로 번역
+        for idx in list(flights) + list(waiting):
+            if idx in waiting:
+                try:
+                    results[idx] = waiting[idx].wait()
+                except Exception as e:
+                    logger.error(f"공유된 세그먼트 번역 실패: {str(e)}")
+            if results[idx] is not None:
+                continue
             try:
-                # 셀 텍스트를 하나의 문자열로 결합 (구분자로 구분)
-                combined_text = "\n---CELL_SEPARATOR---\n".join([text for _, text in cells_data])
-                translated_text = self.translate_text(combined_text, target_lang)
-                
-                if not translated_text:
-                    logger.warning("번역된 텍스트가 비어있습니다.")
-                    return [""] * len(cells_data)
-                    
-                # 번역된 텍스트를 다시 개별 셀로 분리
-                translated_parts = translated_text.split("---CELL_SEPARATOR---")
-                
-                # 원본 셀 수와 번역된 부분의 수가 일치하지 않을 경우 처리
-                if len(translated_parts) != len(cells_data):
-                    logger.warning(f"번역된 셀 수가 일치하지 않습니다. 원본: {len(cells_data)}, 번역: {len(translated_parts)}")
-                    # 부족한 부분은 빈 문자열로 채움
-                    if len(translated_parts) < len(cells_data):
-                        translated_parts.extend([""] * (len(cells_data) - len(translated_parts)))
-                    # 초과된 부분은 제거
-                    translated_parts = translated_parts[:len(cells_data)]
-                    
-                return [part.strip() for part in translated_parts]
-                
+                results[idx] = self.translate_text(cells_data[idx][1], target_lang)
+            except Exception as e:
+                logger.error(f"세그먼트 개별 번역 중 오류 발생: {str(e)}")
+        
+        return [result or "" for result in results]
+    
+    def _translate_claimed_segments(self, cells_data: list, target_lang: str, results: list, flights: dict):
+        """이 호출이 맡은(flights) 세그먼트를 JSON 배치로 번역하여 results에 채웁니다."""
+        if not flights:
+            return
+        
+        # 세그먼트마다 id를 붙여 JSON으로 요청하고, 누락되거나 잘못된 id만 다시 요청
+        sources = {str(idx): cells_data[idx][1] for idx in flights}
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            if not sources:
+                break
+            try:
+                raw = self._translate_with_failover(encode_batch(list(sources.items())), target_lang, json_mode=True)
             except Exception as e:
                 logger.error(f"일괄 번역 중 오류 발생: {str(e)}")
-                return [""] * len(cells_data)
-        
-        # 표 내용 번역
-        for table_idx, table in enumerate(doc.tables):
-            logger.info(f"표 {table_idx + 1} 번역 시작")
-            translatable_cells = []
-            
-            # 번역이 필요한 셀 수집
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip() and is_translatable(cell.text):
-                        translatable_cells.append((cell, cell.text))
-            
-            # 배치 크기 설정 (한 번에 10개 셀씩 처리)
-            BATCH_SIZE = 10
-            total_batches = (len(translatable_cells) + BATCH_SIZE - 1) // BATCH_SIZE
-            
-            for batch_idx in range(total_batches):
-                start_idx = batch_idx * BATCH_SIZE
-                end_idx = min((batch_idx + 1) * BATCH_SIZE, len(translatable_cells))
-                current_batch = translatable_cells[start_idx:end_idx]
-                
-                # 배치 번역 실행
-                translated_texts = batch_translate_cells(current_batch)
-                
-                # 번역 결과 적용
-                for i, translated_text in enumerate(translated_texts):
-                    if translated_text and translated_text.strip():
-                        current_batch[i][0].text = translated_text.strip()
-                
-                # 진행 상태 업데이트
-                progress = (table_idx + (batch_idx + 1) / total_batches) / (len(doc.tables) + 1)  # +1은 단락 처리를 위한 여유
-                progress_bar.progress(progress)
-                status_text.text(f"표 {table_idx + 1}/{len(doc.tables)} 번역 중... ({batch_idx + 1}/{total_batches} 배치)")
-                update_time_info(progress, start_time)
-        
-        # 일반 단락 번역
-        paragraphs_to_translate = [p for p in doc.paragraphs if p.text.strip() and is_translatable(p.text)]
-        total_paragraphs = len(paragraphs_to_translate)
-        
-        for i, paragraph in enumerate(paragraphs_to_translate):
-            if paragraph.text.strip():
-                try:
-                    translated_text = self.translate_text(paragraph.text, target_lang)
-                    if translated_text and translated_text != "번역 불가":
-                        paragraph.text = translated_text
-                    progress = (len(doc.tables) + (i + 1) / total_paragraphs) / (len(doc.tables) + 1)
-                    progress_bar.progress(progress)
-                    status_text.text(f"단락 번역 중... ({i + 1}/{total_paragraphs})")
-                    update_time_info(progress, start_time)
-                except Exception as e:
-                    logger.error(f"단락 번역 중 오류 발생: {str(e)}")
+                break
+            translations, missing = parse_batch_response(raw, sources)
+            for segment_id, translated_text in translations.items():
+                idx = int(segment_id)
+                results[idx] = translated_text
+                self.memory.put(cells_data[idx][1], target_lang, PROMPT_VERSION,
+                                self.model_signature, translated_text)
+                # 같은 세그먼트를 기다리는 다른 요청에 바로 전달
+                self.flights.finish(flights.pop(idx), translated_text)
+            if missing:
+                logger.warning(f"배치 응답에서 {len(missing)}개 세그먼트가 누락되었습니다. (시도 {attempt + 1})")
+                record_event(BATCH_RETRY, count=len(missing))
+            sources = {segment_id: sources[segment_id] for segment_id in missing}
+    
+    def plan_document(self, doc) -> SegmentPlan:
+        """번역 계획(중복 제거된 세그먼트와 토큰 예산 기반 배치)을 만듭니다.
+        
+        계획은 대상 언어와 무관하므로 여러 언어 번역에서 그대로 공유할 수 있습니다.
+        """
+        # 동일한 텍스트는 한 번만 번역하고 모든 위치에 반영
+        return self.build_batches(build_segment_plan(doc))
+    
+    def build_batches(self, plan: SegmentPlan) -> SegmentPlan:
+        """계획의 그룹을 토큰 예산에 맞춰 요청 단위 배치로 묶습니다."""
+        # 셀과 단락을 섞어 요청 하나를 예산까지 채우고, 예산을 넘는 단락은 문장 경계에서 나눔
+        units = []
+        for group in plan.groups:
+            group.pieces, group.separators = split_sentences(group.text, self.token_budget)
+            for piece_idx, piece in enumerate(group.pieces):
+                units.append(((group.index, piece_idx), piece))
+        plan.batches = pack_batches(units, self.token_budget)
+        return plan
+    
+    def translate_plan(self, plan: SegmentPlan, target_lang: str,
+                       progress: Optional[ProgressReporter] = None,
+                       on_group_translated: Optional[Callable[[SegmentGroup, str], None]] = None,
+                       done: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+        """번역 계획의 배치를 동시에 번역하고 {그룹 번호: 번역문}을 반환합니다.
+        
+        on_group_translated는 호출한 스레드에서 문서 순서대로 호출됩니다.
+        done에 있는 그룹(이전에 완료된 번역)은 다시 요청하지 않고 결과에 그대로 포함합니다.
+        """
+        progress = progress or ProgressReporter()
+        start_time = time.time()
+        groups = plan.groups
+        joiner = "" if target_lang in NO_SPACE_LANGUAGES else " "
+        pieces = {group.index: [None] * len(group.pieces) for group in groups}
+        translations = dict(done or {})
+        
+        def run_work_item(batch):
+            """배치 하나를 번역합니다. (작업자 스레드에서 실행)"""
+            if len(batch) > 1:
+                return self._batch_translate_segments(batch, target_lang)
+            try:
+                return [self.translate_text(batch[0][1], target_lang)]
+            except Exception as e:
+                logger.error(f"단락 번역 중 오류 발생: {str(e)}")
+                return [None]
+        
+        def apply_result(batch, result):
+            """번역 결과를 조각 단위로 모으고, 완성된 그룹을 반영합니다. (호출 스레드에서 실행)"""
+            for ((group_idx, piece_idx), _), translated_text in zip(batch, result):
+                if not translated_text or not translated_text.strip() or translated_text == "번역 불가":
                     continue
+                group_pieces = pieces[group_idx]
+                group_pieces[piece_idx] = translated_text.strip()
+                # 나뉜 조각이 모두 번역된 경우에만 반영
+                if any(piece is None for piece in group_pieces):
+                    continue
+                translations[group_idx] = join_pieces(group_pieces, groups[group_idx].separators, joiner)
+                if on_group_translated:
+                    on_group_translated(groups[group_idx], translations[group_idx])
         
-        logger.info("문서 번역 완료")
-        # 번역 완료 시 상태 업데이트
-        progress_bar.progress(1.0)
-        status_text.text("번역 완료")
-        update_time_info(1.0, start_time, is_completed=True)
-        return doc 
\ No newline at end of file
+        # 이미 완료된 그룹은 배치에서 제외
+        work_items = [
+            batch for batch in (
+                [unit for unit in batch if unit[0][0] not in translations] for batch in plan.batches
+            ) if batch
+        ]
+        if translations:
+            logger.info(f"[{target_lang}] 완료된 세그먼트 {len(translations)}개는 이전 결과를 사용합니다.")
+        total_items = len(work_items)
+        logger.info(
+            f"[{target_lang}] 번역 작업 {total_items}건을 최대 {self.max_workers}개 작업자로 실행합니다. "
+            f"(세그먼트 {len(plan.segments)}개 → 고유 {len(groups)}개, 중복 제거율 {plan.dedup_ratio:.1%})"
+        )
+        
+        progress.on_start(total_items, len(plan.segments), len(groups))
+        
+        # 남은 시간은 요청 수가 아니라 남은 원문 토큰과 스트리밍으로 측정한 처리 속도로 추정
+        item_tokens = [sum(estimate_tokens(text) for _, text in item) for item in work_items]
+        token_progress = TokenProgress(sum(item_tokens))
+        
+        # 작업자 스레드에서 발생한 오류와 호출 지표도 이 문서로 모이도록 컨텍스트를 복사하여 실행
+        document_metrics = DocumentMetrics(target_lang)
+        reporter_token = set_current_reporter(progress)
+        metrics_token = set_current_document(document_metrics)
+        results = {}
+        next_to_apply = 0
+        completed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, run_work_item, item): idx
+                    for idx, item in enumerate(work_items)
+                }
+                pending = set(futures)
+                while pending:
+                    # 응답을 기다리는 동안에도 PROGRESS_INTERVAL마다 토큰 진행 상황을 보고
+                    finished, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        idx = futures[future]
+                        results[idx] = future.result()
+                        token_progress.complete(
+                            item_tokens[idx], sum(estimate_tokens(text) for text in results[idx] if text)
+                        )
+                        completed += 1
+                    
+                    # 완료된 결과를 문서 순서대로 반영
+                    while next_to_apply in results:
+                        apply_result(work_items[next_to_apply], results.pop(next_to_apply))
+                        next_to_apply += 1
+                    
+                    # 진행 상태 업데이트
+                    if finished:
+                        progress.on_progress(completed, total_items, f"번역 중... ({completed}/{total_items} 요청 완료)")
+                    progress.on_tokens(
+                        token_progress.done_tokens, token_progress.total_tokens,
+                        *token_progress.estimate(document_metrics.streamed_tokens)
+                    )
+        finally:
+            reset_current_document(metrics_token)
+            reset_current_reporter(reporter_token)
+        
+        logger.info(f"[{target_lang}] 번역 완료 - 번역 메모리 통계: {self.memory.stats()}")
+        logger.info(f"제공자 상태: {self.providers.summary()}")
+        self.router.flush()
+        logger.info(f"[{target_lang}] 라우터 통계 ({self.router.objective}): {self.router.summary(target_lang)}")
+        logger.info(f"요청 한도 상태: { {name: limiter.summary() for name, limiter in self.limiters.items()} }")
+        summary = document_metrics.summary()
+        summary.update(plan.classification)
+        logger.info(f"[{target_lang}] 문서 번역 지표: {summary}")
+        progress.on_summary(summary)
+        progress.on_complete(time.time() - start_time)
+        return translations
+    
+    def translate_document(self, source, target_lang: str,
+                           progress: Optional[ProgressReporter] = None,
+                           plan: Optional[SegmentPlan] = None) -> Document:
+        """Word 문서를 번역합니다. 진행 상황은 progress 보고기로 전달합니다.
+        
+        source는 파일 경로, 파일 객체(BytesIO 등) 또는 이미 연 문서이며, 문서를 직접 수정하여 반환합니다.
+        """
+        logger.info(f"문서 번역 시작 - 대상 언어: {target_lang}")
+        doc = load_document(source)
+        plan = plan or self.plan_document(doc)
+        
+        def apply_group(group: SegmentGroup, translated_text: str):
+            for segment in group.segments:
+                apply_paragraph(segment.target, segment.restore(translated_text))
+        
+        self.translate_plan(plan, target_lang, progress, on_group_translated=apply_group)
+        return doc
+    
+    def translate_document_multi(self, source, target_langs: List[str],
+                                 progress_factory: Optional[Callable[[str], ProgressReporter]] = None,
+                                 plan: Optional[SegmentPlan] = None,
+                                 done: Optional[Dict[str, Dict[int, str]]] = None,
+                                 on_group_translated: Optional[Callable[[str, SegmentGroup, str], None]] = None
+                                 ) -> Dict[str, Document]:
+        """문서를 한 번만 읽고 계획한 뒤 여러 언어로 동시에 번역합니다. {언어: 번역된 문서}를 반환합니다.
+        
+        원본 문서는 수정하지 않으므로, 이미 연 문서와 계획을 여러 번 재사용할 수 있습니다.
+        done은 언어별로 이미 완료된 {그룹 번호: 번역문}이며, on_group_translated(언어, 그룹, 번역문)는
+        그룹 번역이 끝날 때마다 해당 언어의 작업 스레드에서 호출됩니다. (체크포인트 저장용)
+        """
+        logger.info(f"다국어 문서 번역 시작 - 대상 언어: {target_langs}")
+        doc = load_document(source)
+        plan = plan or self.plan_document(doc)
+        translations = self.translate_plan_multi(plan, target_langs, progress_factory, done, on_group_translated)
+        
+        # 언어별로 원본 문서를 복제하여 번역 결과 반영 (XML 재파싱 없이 복제)
+        return {lang: apply_translations(doc, plan, translations[lang]) for lang in target_langs}
+    
+    def translate_plan_multi(self, plan: SegmentPlan, target_langs: List[str],
+                             progress_factory: Optional[Callable[[str], ProgressReporter]] = None,
+                             done: Optional[Dict[str, Dict[int, str]]] = None,
+                             on_group_translated: Optional[Callable[[str, SegmentGroup, str], None]] = None
+                             ) -> Dict[str, Dict[int, str]]:
+        """하나의 번역 계획을 여러 언어로 동시에 번역하고 {언어: {그룹 번호: 번역문}}을 반환합니다."""
+        # 언어별 번역은 동시에 실행하고, 진행 이벤트는 큐를 거쳐 이 스레드에서 보고기로 전달
+        events = queue.Queue()
+        reporters = {
+            lang: QueuedProgressReporter(progress_factory(lang) if progress_factory else ProgressReporter(), events)
+            for lang in target_langs
+        }
+        with ThreadPoolExecutor(max_workers=len(target_langs)) as executor:
+            futures = {
+                lang: executor.submit(
+                    self.translate_plan, plan, lang, reporters[lang],
+                    on_group_translated=(
+                        (lambda group, text, lang=lang: on_group_translated(lang, group, text))
+                        if on_group_translated else None
+                    ),
+                    done=(done or {}).get(lang)
+                )
+                for lang in target_langs
+            }
+            pending = set(futures.values())
+            while pending:
+                _, pending = wait(pending, timeout=0.2)
+                drain_events(events)
+            drain_events(events)
+            return {lang: future.result() for lang, future in futures.items()}
+
+_shared_translator: Optional[DocumentTranslator] = None
+_shared_translator_lock = threading.Lock()
+
+
+def get_translator() -> DocumentTranslator:
+    """프로세스 전체에서 공유하는 번역기를 반환합니다. 처음 호출할 때 한 번만 생성합니다.
+    
+    API 클라이언트와 연결 풀, 번역 메모리, 제공자 상태와 요청 한도가 모든 세션에서 공유됩니다.
+    """
+    global _shared_translator
+    with _shared_translator_lock:
+        if _shared_translator is None:
+            _shared_translator = DocumentTranslator()
+            _shared_translator.warm_up()
+            # METRICS_PORT가 설정된 경우에만 지표 서버 시작
+            start_metrics_server()
+        return _shared_translator
+
+
+def load_document(source) -> Document:
+    """파일 경로나 파일 객체에서 문서를 엽니다. 이미 연 문서는 그대로 반환합니다."""
+    if isinstance(source, DocumentObject):
+        return source
+    return Document(source)
+
+
+def apply_translations(doc: Document, plan: SegmentPlan, translations: Dict[int, str]) -> Document:
+    """원본 문서를 복제하고 {그룹 번호: 번역문}을 복제본에 반영합니다. 원본은 수정하지 않습니다."""
+    translated_doc = copy_document(doc)
+    targets = plan.resolve_targets(translated_doc)
+    for group in plan.groups:
+        translated_text = translations.get(group.index)
+        if translated_text is None:
+            continue
+        for segment in group.segments:
+            apply_paragraph(targets[segment.index], segment.restore(translated_text))
+    return translated_doc
+
+
+def copy_document(document: Document) -> Document:
+    """문서를 패키지째 복제합니다.
+    
+    Document 객체가 캐시한 본문 프록시(_body)는 하위 XML 요소를 별도 트리로 복제하므로,
+    캐시가 없는 새 Document 객체를 만들어 복제해야 저장 시 수정 내용이 반영됩니다.
+    """
+    return copy.deepcopy(DocumentObject(document.element, document.part))
+
+
+def document_to_bytes(document: Document) -> bytes:
+    """문서를 디스크에 쓰지 않고 메모리에서 .docx 바이트로 저장합니다."""
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def documents_to_zip(documents: Dict[str, Document], file_name: str) -> bytes:
+    """언어별 번역 문서를 하나의 zip 파일로 묶습니다. 파일 이름 앞에 언어 코드를 붙입니다."""
+    codes = {name: code for code, name in LANGUAGE_CODES.items()}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for lang, document in documents.items():
+            archive.writestr(f"{codes.get(lang, lang)}_{file_name}", document_to_bytes(document))
+    return buffer.getvalue()
@@ -0,0 +1,25 @@
+from batching import estimate_tokens, join_pieces, split_sentences
+
+MULTILINE = "첫째 줄의 문장입니다.\n둘째 줄의 문장입니다. 같은 줄의 다음 문장입니다.\n\n셋째 줄입니다.\n넷째 줄입니다."
+
+
+def test_multiline_paragraph_round_trips_over_budget():
+    pieces, separators = split_sentences(MULTILINE, 20)
+    assert len(pieces) > 1
+    assert all(estimate_tokens(piece) <= 20 for piece in pieces)
+    assert join_pieces(pieces, separators, " ") == MULTILINE
+
+
+def test_sentence_spaces_use_target_joiner():
+    pieces, separators = split_sentences(MULTILINE, 20)
+    joined = join_pieces(pieces, separators, "")
+    assert joined.count("\n") == MULTILINE.count("\n")
+    assert joined.replace("\n", "") == MULTILINE.replace("\n", "").replace(". ", ".")
+
+
+def test_split_keeps_tag_spans_together():
+    text = "<1>첫 문장입니다. 두 번째 문장도 굵게입니다.</1>\n세 번째 문장입니다. <2/>네 번째 문장입니다."
+    pieces, separators = split_sentences(text, 12)
+    for piece in pieces:
+        assert piece.count("<1>") == piece.count("</1>")
+    assert join_pieces(pieces, separators) == text
@@ -0,0 +1,18 @@
+from batch_protocol import encode_batch
+from batching import estimate_tokens
+from prompts import build_prompt, prompt_overhead
+
+
+def test_batch_payload_counts_only_segment_texts():
+    segments = [("1", "첫 번째 세그먼트입니다."), ("2", "두 번째 <1>세그먼트</1>입니다.")]
+    request = encode_batch(segments)
+    system, user = build_prompt(request, "English", json_mode=True)
+    overhead, payload = prompt_overhead(system, user, request, json_mode=True)
+    assert payload == sum(estimate_tokens(text) for _, text in segments)
+    assert overhead + payload == estimate_tokens(system) + estimate_tokens(user)
+
+
+def test_single_payload_is_the_text():
+    text = "번역할 문장입니다."
+    system, user = build_prompt(text, "English")
+    assert prompt_overhead(system, user, text)[1] == estimate_tokens(text)
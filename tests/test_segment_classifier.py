@@ -0,0 +1,33 @@
+import pytest
+
+from segment_classifier import PASS_THROUGH, SKIP, TRANSLATE, classify, restore
+
+
+@pytest.mark.parametrize("text", [
+    "Section 1(a) -- 계약 해지 조건",
+    "\"보증 기간\";",
+    "제3조(목적) # 참고 사항",
+    "납품 일정 -> 계약 체결 후 30일",
+])
+def test_prose_with_code_like_punctuation_is_translated(text):
+    assert classify(text).label == TRANSLATE
+
+
+@pytest.mark.parametrize("text", [
+    "if (count == 0) { logger.error(\"오류\"); }",
+    "const label = \"저장\"; // 저장 버튼",
+    "return_value = fetch_all(table_name);",
+])
+def test_code_with_korean_only_in_literals_passes_through(text):
+    assert classify(text).label == PASS_THROUGH
+
+
+def test_numbers_are_skipped():
+    assert classify("₩1,200,000 (2024.03.01)").label == SKIP
+
+
+def test_protected_spans_are_masked_and_restored():
+    result = classify("자세한 내용은 https://example.com/docs 를 참고하세요.")
+    assert result.label == TRANSLATE
+    assert "https://" not in result.text
+    assert restore(result.text, result.protected) == "자세한 내용은 https://example.com/docs 를 참고하세요."
@@ -0,0 +1,56 @@
+import zipfile
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from streaming_docx import iter_streamed_segments, write_translated
+
+INLINE_SDT = (
+    f'<w:sdt {nsdecls("w")}><w:sdtPr/><w:sdtContent><w:r><w:t>홍길동</w:t></w:r></w:sdtContent></w:sdt>'
+)
+INLINE_CUSTOM_XML = (
+    f'<w:customXml {nsdecls("w")} w:element="name"><w:r><w:t>김철수</w:t></w:r></w:customXml>'
+)
+BLOCK_SDT = (
+    f'<w:sdt {nsdecls("w")}><w:sdtPr/><w:sdtContent>'
+    '<w:p><w:r><w:t>블록 단락입니다.</w:t></w:r></w:p>'
+    '</w:sdtContent></w:sdt>'
+)
+
+
+def make_document(path):
+    """단락 안(인라인)과 본문(블록)에 콘텐츠 컨트롤이 있는 문서."""
+    doc = Document()
+    paragraph = doc.add_paragraph("담당자: ")
+    paragraph._p.append(parse_xml(INLINE_SDT))
+    paragraph._p.append(parse_xml(INLINE_CUSTOM_XML))
+    doc.element.body.insert(1, parse_xml(BLOCK_SDT))
+    doc.save(path)
+
+
+def test_inline_content_controls_stay_inside_paragraph(tmp_path):
+    source = str(tmp_path / "source.docx")
+    output = str(tmp_path / "output.docx")
+    make_document(source)
+
+    segments = list(iter_streamed_segments(source))
+    # 인라인 콘텐츠 컨트롤은 DOM 경로와 마찬가지로 단락의 일부로 남고, 블록 단락은 번역 대상
+    assert [text for _, _, text in segments] == ["담당자: ", "블록 단락입니다."]
+
+    write_translated(source, output, {position: f"번역{position}" for _, position, _ in segments})
+
+    with zipfile.ZipFile(output) as package:
+        body = parse_xml(package.read("word/document.xml")).find(qn("w:body"))
+    # 본문 바로 아래에는 단락, 콘텐츠 컨트롤, 구역 설정만 있어야 함
+    assert {child.tag for child in body} <= {qn("w:p"), qn("w:sdt"), qn("w:sectPr")}
+    assert body.find(qn("w:sdtPr")) is None and body.find(qn("w:r")) is None
+
+    paragraph = body.find(qn("w:p"))
+    inline_texts = [
+        "".join(t.text for t in paragraph.find(qn(tag)).iter(qn("w:t"))) for tag in ("w:sdt", "w:customXml")
+    ]
+    assert inline_texts == ["홍길동", "김철수"]
+    assert Document(output).paragraphs[0].runs[0].text == "번역0"
+    block = body.find(qn("w:sdt")).find(qn("w:sdtContent")).find(qn("w:p"))
+    assert "".join(t.text for t in block.iter(qn("w:t"))) == "번역1"